@@ -5,8 +5,8 @@ import json
 import datetime
 from pathlib import Path
 from utils.file_analysis import (
-    get_file_metadata, extract_strings, analyze_file_structure,
-    calculate_entropy, get_byte_frequency, get_hex_dump, run_zsteg
+    start_file_tools, metadata_report, zsteg_report, extract_strings, analyze_file_structure,
+    fingerprint_file, byte_frequency_from_histogram, hex_rows, hex_window, HEX_WINDOW_SIZE
 )
 from utils.visualizations import (
     create_entropy_plot, create_byte_frequency_plot, format_hex_dump,
@@ -15,7 +15,8 @@ from utils.visualizations import (
 from utils.database import (
     save_analysis, get_recent_analyses, get_analysis_by_id, DB_AVAILABLE
 )
-from utils.stego_detector import analyze_image_for_steganography
+from utils.stego_detector import analyze_image_for_steganography, analyze_audio_for_steganography
+from utils.tool_registry import get_tool_registry
 
 # Configure Streamlit page
 st.set_page_config(
@@ -206,6 +207,38 @@ def info_button(id_name, info_text):
     </div>
     """
 
+def show_hex_view(file_path, file_size, structure, head=b''):
+    """
+    Paged hex dump that can jump to the embedded files found in the structure scan.
+
+    Windows that lie inside ``head`` (the leading bytes kept by
+    fingerprint_file) are shown from it; only other windows read the file.
+    """
+    jump_targets = {"Start of file": 0}
+    for hit in structure:
+        jump_targets[f"{hit['type']} at 0x{hit['offset']:08x}"] = hit["offset"]
+
+    jump_col, page_col = st.columns(2)
+    with jump_col:
+        target = st.selectbox("Jump to", list(jump_targets), key="hex-jump")
+    base = jump_targets[target]
+    with page_col:
+        # Keyed by the jump target so the page resets after a jump
+        last_page = max(0, (file_size - base - 1) // HEX_WINDOW_SIZE)
+        page = st.number_input(f"Page (0-{last_page})", min_value=0, max_value=last_page,
+                               value=0, step=1, key=f"hex-page-{base}")
+
+    offset = base + int(page) * HEX_WINDOW_SIZE
+    window_end = min(offset + HEX_WINDOW_SIZE, file_size)
+    if window_end <= len(head):
+        rows = hex_rows(head[offset:window_end], offset)
+    else:
+        rows = hex_window(file_path, offset, HEX_WINDOW_SIZE)
+    if rows:
+        end = rows[-1]["address"] + len(rows[-1]["bytes"])
+        st.caption(f"Bytes 0x{offset:08x}-0x{end - 1:08x} of {file_size:,}")
+    st.markdown(format_hex_dump(rows), unsafe_allow_html=True)
+
 # Display banner with logo reference
 from pathlib import Path
 
@@ -311,11 +344,23 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# External tools are probed once per process; missing ones are skipped or
+# replaced by the built-in implementations
+with st.expander("🔧 External Tools"):
+    for tool in get_tool_registry().to_list():
+        if tool["available"]:
+            status = f"✅ {tool['version'] or 'installed'} ({tool['path']})"
+        else:
+            status = "❌ not installed"
+        if tool["native"]:
+            status += f" - built-in {tool['native']} is used"
+        st.markdown(f"**{tool['name']}:** {status}")
+
 # Main content - File upload
 uploaded_file = st.file_uploader(
     "Drop your file here",
-    type=['png', 'jpg', 'jpeg'],
-    help="Supported formats: PNG, JPEG"
+    type=['png', 'jpg', 'jpeg', 'gif', 'wav'],
+    help="Supported formats: PNG (including APNG), JPEG, GIF, WAV"
 )
 
 if uploaded_file:
@@ -324,19 +369,26 @@ if uploaded_file:
         tmp_file.write(uploaded_file.getvalue())
         temp_path = tmp_file.name
 
+    # External tools run in the background while the in-process analysis proceeds
+    file_type = Path(uploaded_file.name).suffix.lower()[1:]  # Remove the dot
+    tool_futures = start_file_tools(temp_path, file_type)
+
     try:
-        # Run initial analysis
-        file_size = os.path.getsize(temp_path)
-        file_type = Path(uploaded_file.name).suffix.lower()[1:]  # Remove the dot
-        entropy_value = calculate_entropy(temp_path)
-        metadata = get_file_metadata(temp_path)
-        is_image = file_type in ['png', 'jpg', 'jpeg']
+        # Run initial analysis; one read gives hashes, histogram, entropy and head bytes
+        fingerprint = fingerprint_file(temp_path)
+        file_size = fingerprint["size"]
+        entropy_value = fingerprint["entropy"]
+        is_image = file_type in ['png', 'jpg', 'jpeg', 'gif']
+        is_audio = file_type == 'wav'
         
-        # Only PNG and JPEG images are supported for advanced analysis
-        if is_image:
+        # PNG, JPEG and GIF images and WAV audio are supported for advanced analysis
+        if is_image or is_audio:
             # Run stego detection with enhanced sensitivity algorithms
             try:
-                detection_result = analyze_image_for_steganography(temp_path)
+                if is_audio:
+                    detection_result = analyze_audio_for_steganography(temp_path)
+                else:
+                    detection_result = analyze_image_for_steganography(temp_path)
                 likelihood = detection_result.likelihood
                 likelihood_percentage = f"{likelihood*100:.1f}%"
                 
@@ -358,6 +410,9 @@ if uploaded_file:
                 color = "#00ff00"
                 detection_result = None
             
+            # Waited for only now, so exiftool runs alongside the detection above
+            metadata = metadata_report(tool_futures.get("exiftool"))
+            
             # Save analysis to database if available
             if DB_AVAILABLE:
                 # Convert metadata to JSON string
@@ -386,6 +441,11 @@ if uploaded_file:
                         Entropy: {entropy_value:.4f}
                     </span>
                 </div>
+                <div style="color: #00ffff; font-family: monospace; font-size: 0.8em; margin-top: 10px;">
+                    Detected: {fingerprint["magic"] or "Unknown"}<br>
+                    SHA-256: {fingerprint["sha256"]}<br>
+                    MD5: {fingerprint["md5"]}
+                </div>
             </div>
             """, unsafe_allow_html=True)
             
@@ -425,7 +485,7 @@ if uploaded_file:
                 st.markdown(f"### Byte Frequency Analysis {info_button('byte-info', byte_info)}", unsafe_allow_html=True)
                 
                 st.markdown('<div class="visualization-container">', unsafe_allow_html=True)
-                bytes_values, frequencies = get_byte_frequency(temp_path)
+                bytes_values, frequencies = byte_frequency_from_histogram(fingerprint["histogram"])
                 st.plotly_chart(
                     create_byte_frequency_plot(bytes_values, frequencies),
                     use_container_width=True
@@ -508,13 +568,45 @@ if uploaded_file:
                     </div>
                     """, unsafe_allow_html=True)
                 
+                # Per-frame results for animated images
+                if detection_result and getattr(detection_result, 'frames', None):
+                    st.markdown("#### Frame Analysis")
+                    with st.expander(f"View {len(detection_result.frames)} Frames"):
+                        for frame in detection_result.frames:
+                            flag = " ⚠️ changed only in low bits" if frame["low_bit_only"] else ""
+                            st.markdown(
+                                f"**Frame {frame['frame']}:** {frame['likelihood']*100:.1f}% "
+                                f"(low-bit changes: {frame['low_bit_changes']}, "
+                                f"other changes: {frame['other_changes']}){flag}"
+                            )
+                
+                # Structural findings from the native format parsers
+                structure_result = getattr(detection_result, 'structure', None) if detection_result else None
+                if structure_result:
+                    st.markdown("#### Structure Findings")
+                    with st.expander(f"View {len(structure_result['findings'])} Findings"):
+                        if structure_result.get("quant_fingerprint"):
+                            encoder = structure_result["encoder"] or "custom quantization tables"
+                            st.markdown(f"**Encoder:** {encoder} (`{structure_result['quant_fingerprint']}`)")
+                        for finding in structure_result["findings"]:
+                            st.markdown(
+                                f"**0x{finding['offset']:08x}:** {finding['detail']} "
+                                f"({finding['severity']*100:.0f}%)"
+                            )
+                        # PNG text chunks and JPEG APPn/COM segments
+                        for chunk in structure_result.get("text_chunks", []):
+                            st.markdown(f"**{chunk['type']}** '{chunk['keyword']}': {chunk['size']} bytes")
+                        for segment in structure_result.get("app_segments", []):
+                            label = f" '{segment['identifier']}'" if segment["identifier"] else ""
+                            st.markdown(f"**{segment['marker']}**{label}: {segment['size']} bytes")
+                
                 # ZSTEG Output (for PNG files)
                 if file_type.lower() == 'png':
                     zsteg_info = "ZSTEG is a tool specifically designed to detect various steganography techniques in PNG files, scanning multiple bit planes and channels."
                     st.markdown(f"### ZSTEG Analysis {info_button('zsteg-info', zsteg_info)}", unsafe_allow_html=True)
                     
-                    # Run ZSTEG with -a option
-                    zsteg_output = run_zsteg(temp_path)
+                    # ZSTEG -a was started with the other tools; wait for it here
+                    zsteg_output = zsteg_report(tool_futures.get("zsteg"))
                     
                     # Display the output in a scrollable area with syntax highlighting
                     st.markdown("""
@@ -535,10 +627,10 @@ if uploaded_file:
             
             # Additional analysis sections (full width)
             # String Analysis with info button
-            strings_info = "String extraction identifies ASCII text within binary data that could represent hidden messages or embedded content."
+            strings_info = "String extraction identifies ASCII and UTF-16 text within binary data that could represent hidden messages or embedded content."
             st.markdown(f"### String Analysis {info_button('strings-info', strings_info)}", unsafe_allow_html=True)
             
-            strings = extract_strings(temp_path)
+            strings = extract_strings(temp_path, max_count=100)
             
             # Create circular visualization for strings (matching concept art)
             st.markdown('<div class="visualization-container">', unsafe_allow_html=True)
@@ -555,14 +647,25 @@ if uploaded_file:
             st.markdown(f"### File Structure {info_button('structure-info', structure_info)}", unsafe_allow_html=True)
             
             structure = analyze_file_structure(temp_path)
-            st.code(structure)
+            if structure:
+                st.dataframe([
+                    {
+                        "Offset": f"0x{hit['offset']:08x}",
+                        "Type": hit["type"],
+                        "Length": hit["length"],
+                        "Confidence": f"{hit['confidence']*100:.0f}%",
+                        "Truncated": hit["truncated"]
+                    }
+                    for hit in structure
+                ], use_container_width=True)
+            else:
+                st.info("No embedded file signatures found")
             
             # Hex Dump with info button
             hex_info = "Hexadecimal dump displays the raw binary data of the file, which can reveal hidden patterns or anomalies not visible in other analyses."
             st.markdown(f"### Hex Dump {info_button('hex-info', hex_info)}", unsafe_allow_html=True)
             
-            hex_dump = get_hex_dump(temp_path)
-            st.markdown(format_hex_dump(hex_dump), unsafe_allow_html=True)
+            show_hex_view(temp_path, file_size, structure, fingerprint["head"])
             
             # Mobile App Version Info
             st.markdown("### 📱 Mobile App Version")
@@ -603,8 +706,13 @@ if uploaded_file:
                         Entropy: {entropy_value:.4f}
                     </span>
                 </div>
+                <div style="color: #00ffff; font-family: monospace; font-size: 0.8em; margin-top: 10px;">
+                    Detected: {fingerprint["magic"] or "Unknown"}<br>
+                    SHA-256: {fingerprint["sha256"]}<br>
+                    MD5: {fingerprint["md5"]}
+                </div>
                 <p style="color: #ffffff; font-family: monospace; margin-top: 15px;">
-                    Advanced steganography analysis is only available for PNG and JPEG images.
+                    Advanced steganography analysis is only available for PNG, JPEG and GIF images and WAV audio.
                 </p>
             </div>
             """, unsafe_allow_html=True)
@@ -625,10 +733,10 @@ if uploaded_file:
                 st.markdown('</div>', unsafe_allow_html=True)
                 
                 # String Analysis with info button
-                strings_info = "String extraction identifies ASCII text within binary data that could represent hidden messages or embedded content."
+                strings_info = "String extraction identifies ASCII and UTF-16 text within binary data that could represent hidden messages or embedded content."
                 st.markdown(f"### String Analysis {info_button('strings-info', strings_info)}", unsafe_allow_html=True)
                 
-                strings = extract_strings(temp_path)
+                strings = extract_strings(temp_path, max_count=100)
                 
                 # Create circular visualization for strings (matching concept art)
                 st.markdown('<div class="visualization-container">', unsafe_allow_html=True)
@@ -645,6 +753,7 @@ if uploaded_file:
                 metadata_info = "Metadata includes information embedded in file headers that might contain clues about hidden data or file manipulation."
                 st.markdown(f"### File Metadata {info_button('metadata-info', metadata_info)}", unsafe_allow_html=True)
                 
+                metadata = metadata_report(tool_futures.get("exiftool"))
                 for key, value in metadata.items():
                     st.markdown(f"**{key}:** {value}")
                 
@@ -653,17 +762,30 @@ if uploaded_file:
                 st.markdown(f"### File Structure {info_button('structure-info', structure_info)}", unsafe_allow_html=True)
                 
                 structure = analyze_file_structure(temp_path)
-                st.code(structure)
+                if structure:
+                    st.dataframe([
+                        {
+                            "Offset": f"0x{hit['offset']:08x}",
+                            "Type": hit["type"],
+                            "Length": hit["length"],
+                            "Confidence": f"{hit['confidence']*100:.0f}%",
+                            "Truncated": hit["truncated"]
+                        }
+                        for hit in structure
+                    ], use_container_width=True)
+                else:
+                    st.info("No embedded file signatures found")
             
             # Hex Dump (full width) with info button
             hex_info = "Hexadecimal dump displays the raw binary data of the file, which can reveal hidden patterns or anomalies not visible in other analyses."
             st.markdown(f"### Hex Dump {info_button('hex-info', hex_info)}", unsafe_allow_html=True)
             
-            hex_dump = get_hex_dump(temp_path)
-            st.markdown(format_hex_dump(hex_dump), unsafe_allow_html=True)
+            show_hex_view(temp_path, file_size, structure, fingerprint["head"])
 
     finally:
-        # Cleanup temporary file
+        # Stop tools whose output was never needed, then cleanup temporary file
+        for future in tool_futures.values():
+            future.cancel()
         os.unlink(temp_path)
 else:
     st.info("👆 Upload a file to begin analysis")
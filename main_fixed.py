@@ -6,7 +6,7 @@ import datetime
 from pathlib import Path
 from utils.file_analysis import (
     get_file_metadata, extract_strings, analyze_file_structure,
-    calculate_entropy, get_byte_frequency, get_hex_dump, run_zsteg
+    calculate_entropy, get_byte_frequency, hex_window, run_zsteg
 )
 from utils.visualizations import (
     create_entropy_plot, create_byte_frequency_plot, format_hex_dump,
@@ -315,7 +315,7 @@ if uploaded_file:
             hex_info = "Hexadecimal dump displays the raw binary data of the file, which can reveal hidden patterns or anomalies not visible in other analyses."
             st.markdown(f"### Hex Dump {info_button('hex-info', hex_info)}", unsafe_allow_html=True)
             
-            hex_dump = get_hex_dump(temp_path)
+            hex_dump = hex_window(temp_path)
             st.markdown(format_hex_dump(hex_dump), unsafe_allow_html=True)
             
             # Mobile App Version Info
@@ -404,7 +404,7 @@ if uploaded_file:
             hex_info = "Hexadecimal dump displays the raw binary data of the file, which can reveal hidden patterns or anomalies not visible in other analyses."
             st.markdown(f"### Hex Dump {info_button('hex-info', hex_info)}", unsafe_allow_html=True)
             
-            hex_dump = get_hex_dump(temp_path)
+            hex_dump = hex_window(temp_path)
             st.markdown(format_hex_dump(hex_dump), unsafe_allow_html=True)
 
     finally:
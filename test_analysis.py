@@ -78,4 +78,78 @@ strings = extract_strings(image_path)
 for s in strings[:10]:
     print(s)
 
-print("\n=== ANALYSIS COMPLETE ===")
\ No newline at end of file
+print("\n=== ANALYSIS COMPLETE ===")
+# Regression: short XOR'd payloads followed by cover noise
+print("\n=== XOR KEY RECOVERY ===")
+import numpy as np
+from utils.stego_decoder import find_xor_key, xor_bytes
+
+rng = np.random.default_rng(0)
+message = (b"Meet me at the old station after dark and bring the documents with you. "
+           b"The key is under the third stone from the left, next to the gate. ") * 4
+with open(image_path, 'rb') as f:
+    png_payload = f.read(330)
+for key in (b'\x85', b'k3y', b'secretkey'):
+    for length in (100, 200, 330):
+        window = xor_bytes(message[:length], key) + rng.integers(0, 256, 512, dtype=np.uint8).tobytes()
+        found = find_xor_key(window[:512])
+        print(f"text, key {key!r}, {length} bytes: {found}")
+        assert found and found[0] == key
+window = xor_bytes(png_payload, b'k3y') + rng.integers(0, 256, 512, dtype=np.uint8).tobytes()
+found = find_xor_key(window[:512])
+print(f"PNG, key b'k3y', 330 bytes: {found}")
+assert found and found[0] == b'k3y'
+assert find_xor_key(b'\xff' * 512) is None
+
+# Regression: a ZIP appended to an image is reported once, not once per entry
+print("\n=== APPENDED ARCHIVE ===")
+import io
+import tempfile
+import zipfile
+from utils.carving import scan_file
+
+archive = io.BytesIO()
+with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as z:
+    for i in range(5):
+        z.writestr(f"part{i}.txt", message)
+with open(image_path, 'rb') as f:
+    host = f.read()
+with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
+    tmp.write(host + archive.getvalue())
+try:
+    zips = [a for a in scan_file(tmp.name) if a.file_type == "ZIP"]
+finally:
+    os.unlink(tmp.name)
+print(f"ZIP artifacts: {[(a.offset, a.size, a.info) for a in zips]}")
+assert len(zips) == 1 and zips[0].offset == len(host) and zips[0].info["entries"] == 5
+
+# Regression: adjacent UTF-16LE and UTF-16BE strings keep their own labels
+print("\n=== UTF-16 STRINGS ===")
+from utils.file_analysis import iter_strings
+
+mixed = (b'\0\0' + 'Little'.encode('utf-16le') + 'Big!'.encode('utf-16be')
+         + 'Endian'.encode('utf-16le') + b'\0\0')
+with tempfile.NamedTemporaryFile(delete=False) as tmp:
+    tmp.write(mixed)
+try:
+    found = [(s["offset"], s["encoding"], s["text"]) for s in iter_strings(tmp.name)]
+    assert found == [(s["offset"], s["encoding"], s["text"]) for s in iter_strings(tmp.name, chunk_size=5)]
+finally:
+    os.unlink(tmp.name)
+print(f"Strings: {found}")
+assert found == [(2, "utf-16le", "Little"), (14, "utf-16be", "Big!"), (22, "utf-16le", "Endian")]
+
+# Regression: the bytes after the last full entropy block get their own window
+print("\n=== ENTROPY PROFILE TAIL ===")
+from utils.file_analysis import entropy_profile, ENTROPY_BLOCK_SIZE
+
+blob = rng.integers(0, 256, 2000, dtype=np.uint8).tobytes()
+with tempfile.NamedTemporaryFile(delete=False) as tmp:
+    tmp.write(b'\0' * (4 * ENTROPY_BLOCK_SIZE) + blob)
+try:
+    profile = entropy_profile(tmp.name)
+finally:
+    os.unlink(tmp.name)
+print(f"Windows: {profile['offsets'].tolist()}, regions: {profile['regions']}")
+assert profile["offsets"][-1] == 5 * ENTROPY_BLOCK_SIZE
+assert profile["regions"][-1]["end"] == 4 * ENTROPY_BLOCK_SIZE + len(blob)
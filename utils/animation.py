@@ -0,0 +1,57 @@
+"""
+Lazy frame access for animated images (GIF, APNG).
+Frames are decoded one at a time with ImageSequence, so memory use does not
+grow with the length of the animation.
+"""
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+def is_animated(image_path):
+    """Whether an image file holds more than one frame."""
+    try:
+        with Image.open(image_path) as img:
+            return bool(getattr(img, "is_animated", False)) and getattr(img, "n_frames", 1) > 1
+    except Exception:
+        return False
+
+def iter_frames(image_path, max_frames=None):
+    """
+    Iterate over the frames of an image as RGB arrays.
+
+    Each array is a fresh copy, so callers may keep the previous frame
+    around for differencing; nothing else is retained between frames.
+
+    Args:
+        image_path: Path to the image file
+        max_frames: Stop after this many frames (None = all)
+
+    Yields:
+        Tuples of (frame index, HxWx3 uint8 array, frame duration in ms)
+    """
+    with Image.open(image_path) as img:
+        for index, frame in enumerate(ImageSequence.Iterator(img)):
+            if max_frames is not None and index >= max_frames:
+                break
+            pixels = np.array(frame.convert('RGB'))
+            yield index, pixels, frame.info.get("duration", 0)
+
+def low_bit_changes(previous, current):
+    """
+    Compare two frames pixel by pixel.
+
+    Args:
+        previous: HxWx3 array of the earlier frame
+        current: HxWx3 array of the later frame
+
+    Returns:
+        Tuple of (pixels changed only in their least significant bits,
+        pixels changed in higher bits)
+    """
+    if previous.shape != current.shape:
+        return 0, int(current.shape[0] * current.shape[1])
+    diff = np.bitwise_xor(previous, current)
+    changed = diff.any(axis=2)
+    high_changed = (diff & 0xFE).any(axis=2)
+    low_only = int(np.count_nonzero(changed & ~high_changed))
+    return low_only, int(np.count_nonzero(high_changed))
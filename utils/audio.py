@@ -0,0 +1,150 @@
+"""
+PCM WAV access for steganography analysis.
+Parses the RIFF chunk layout and maps the sample data with np.memmap, so
+even hour-long recordings are read page by page instead of loaded whole.
+"""
+
+import struct
+import numpy as np
+
+# Format tags of uncompressed PCM audio
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Sample widths the analysis supports, in bytes
+SUPPORTED_SAMPLE_WIDTHS = (1, 2, 3)
+
+# Samples processed per block by the streaming statistics
+AUDIO_CHUNK_SAMPLES = 1 << 20
+
+class WavInfo:
+    """Layout of the PCM data in a WAV file."""
+    def __init__(self, path, channels, sample_rate, sample_width, data_offset, data_size):
+        self.path = path
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width  # Bytes per sample
+        self.data_offset = data_offset
+        self.data_size = data_size
+        self.frames = data_size // (channels * sample_width)
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds."""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def to_dict(self):
+        return {
+            "channels": self.channels,
+            "sample_rate": self.sample_rate,
+            "bits_per_sample": self.sample_width * 8,
+            "frames": self.frames,
+            "duration": self.duration
+        }
+
+def is_wav_file(path):
+    """Check the RIFF/WAVE magic without parsing further."""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return False
+    return len(header) == 12 and header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+
+def read_wav_info(path):
+    """
+    Locate the fmt and data chunks of a PCM WAV file.
+
+    Only chunk headers are read; the data chunk is skipped over.
+
+    Args:
+        path: Path to the WAV file
+
+    Returns:
+        WavInfo object
+
+    Raises:
+        ValueError: If the file is not an uncompressed 8/16/24-bit PCM WAV
+    """
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) != 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            chunk_start = f.tell()
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(min(chunk_size, 40))
+            elif chunk_id == b'data':
+                if fmt is None or len(fmt) < 16:
+                    raise ValueError("data chunk before fmt chunk")
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                    format_tag = struct.unpack('<H', fmt[24:26])[0]
+                if format_tag != WAVE_FORMAT_PCM:
+                    raise ValueError(f"Unsupported WAV format tag 0x{format_tag:04x}")
+
+                sample_width = (bits + 7) // 8
+                if sample_width not in SUPPORTED_SAMPLE_WIDTHS or channels == 0:
+                    raise ValueError(f"Unsupported PCM layout ({bits}-bit, {channels} channels)")
+
+                # Truncated files declare more data than they hold
+                f.seek(0, 2)
+                data_size = min(chunk_size, f.tell() - chunk_start)
+                return WavInfo(str(path), channels, sample_rate, sample_width, chunk_start, data_size)
+
+            # Chunks are word aligned
+            f.seek(chunk_start + chunk_size + (chunk_size & 1))
+
+    raise ValueError("No data chunk found")
+
+def pcm_low_bytes(info):
+    """
+    Least significant byte of every sample, as a (frames, channels) view.
+
+    WAV samples are little-endian, so the byte holding the low bits comes
+    first in each sample whatever the sample width. The view is strided
+    over a memmap and copies nothing.
+
+    Args:
+        info: WavInfo from read_wav_info
+
+    Returns:
+        Read-only uint8 array of shape (frames, channels)
+    """
+    if info.frames == 0:
+        return np.zeros((0, info.channels), dtype=np.uint8)
+    raw = np.memmap(info.path, dtype=np.uint8, mode='r', offset=info.data_offset,
+                    shape=(info.frames, info.channels, info.sample_width))
+    return raw[:, :, 0]
+
+def iter_pcm_samples(info, chunk_samples=AUDIO_CHUNK_SAMPLES):
+    """
+    Stream sample values block by block.
+
+    Args:
+        info: WavInfo from read_wav_info
+        chunk_samples: Frames per block
+
+    Yields:
+        int32 arrays of shape (frames, channels); 8-bit samples are
+        re-centred around zero like the wider signed formats
+    """
+    if info.frames == 0:
+        return
+    raw = np.memmap(info.path, dtype=np.uint8, mode='r', offset=info.data_offset,
+                    shape=(info.frames, info.channels, info.sample_width))
+    for start in range(0, info.frames, chunk_samples):
+        block = np.asarray(raw[start:start + chunk_samples]).astype(np.int32)
+        if info.sample_width == 1:
+            yield block[:, :, 0] - 128
+        elif info.sample_width == 2:
+            yield ((block[:, :, 1] << 24) >> 16) | block[:, :, 0]
+        else:
+            yield ((block[:, :, 2] << 24) >> 8) | (block[:, :, 1] << 8) | block[:, :, 0]
@@ -0,0 +1,466 @@
+"""
+File carving utilities.
+Finds embedded files at any offset inside extracted data streams and
+determines their extent from the format's own structure.
+"""
+
+import os
+import mmap
+import struct
+import zlib
+import bz2
+import numpy as np
+
+# Upper bound on how far a single artifact may extend past its signature
+MAX_CARVE_SIZE = 64 * 1024 * 1024
+
+# Stop scanning a stream once this many artifacts have been carved
+MAX_ARTIFACTS = 64
+
+# Stop scanning a file once this many embedded signatures have been found
+MAX_SIGNATURE_HITS = 256
+
+# Bytes searched per step for signature candidates
+SCAN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Confidence that a validated hit is a real file, by how much of its
+# structure the parser checks (CRCs and full decompression rank highest)
+SIGNATURE_CONFIDENCE = {
+    "PNG": 0.99, "7Z": 0.99, "GZIP": 0.99, "BZIP2": 0.99,
+    "JPEG": 0.9, "ZIP": 0.9, "GIF": 0.85, "PDF": 0.85,
+    "ELF": 0.75, "PE": 0.75, "BMP": 0.7,
+}
+
+# Confidence is scaled by this when the data ends before the artifact does
+TRUNCATED_CONFIDENCE_FACTOR = 0.5
+
+class CarvedArtifact:
+    """Container for a file carved out of a larger data stream."""
+    def __init__(self, file_type, offset, size, truncated=False, info=None):
+        self.file_type = file_type  # Detected format (e.g. "PNG")
+        self.offset = offset  # Offset of the signature within the stream
+        self.size = size  # Size of the artifact in bytes
+        self.truncated = truncated  # Whether the stream ended before the artifact did
+        self.info = info or {}  # Format-specific details from the structure parse
+
+    @property
+    def confidence(self):
+        """How likely the artifact is a real file rather than a chance match."""
+        confidence = SIGNATURE_CONFIDENCE.get(self.file_type, 0.5)
+        if self.truncated:
+            confidence *= TRUNCATED_CONFIDENCE_FACTOR
+        return confidence
+
+    def extract(self, data):
+        """Return the artifact's bytes from the stream it was carved from."""
+        return bytes(data[self.offset:self.offset + self.size])
+
+    def to_dict(self):
+        """Convert artifact to dictionary."""
+        return {
+            "file_type": self.file_type,
+            "offset": self.offset,
+            "size": self.size,
+            "truncated": self.truncated,
+            "confidence": self.confidence,
+            "info": self.info
+        }
+
+    def __repr__(self):
+        return f"CarvedArtifact(type={self.file_type}, offset={self.offset}, size={self.size})"
+
+class _ScanState:
+    """
+    Shared state for one carving pass over a stream.
+
+    Terminator searches are cached so that many candidate headers sharing the
+    same terminator cost one forward scan in total instead of one scan each.
+    Structure positions that a failed walk has already visited are remembered,
+    so later candidates that chain into the same positions fail immediately
+    instead of re-walking them.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.dead = set()  # Positions known to lead to an invalid structure
+        self._ends = {}  # marker -> (offset searched from, result)
+
+    def find_end(self, marker, offset, limit):
+        """Find the next occurrence of marker at or after offset, before limit."""
+        cached = self._ends.get(marker)
+        if cached and cached[0] <= offset and (cached[1] == -1 or cached[1] >= offset):
+            found = cached[1]
+        else:
+            found = self.data.find(marker, offset)
+            self._ends[marker] = (offset, found)
+        if found == -1 or found >= limit:
+            return -1
+        return found
+
+    def walk_failed(self, positions):
+        """Record the positions of a structure walk that turned out invalid."""
+        self.dead.update(positions)
+        return None
+
+# Real JPEGs have a few dozen header segments before SOS; walking more than
+# this means the candidate is garbage that happens to chain together
+_MAX_JPEG_SEGMENTS = 256
+
+# Structure parsers
+# Each parser takes (data, offset, limit, state) and returns (size, info) for a
+# valid artifact, or None if the bytes at offset only look like the signature.
+
+def _parse_png(data, offset, limit, state):
+    pos = offset + 8
+    chunks = 0
+    while pos + 12 <= limit:
+        length, = struct.unpack_from('>I', data, pos)
+        chunk_type = bytes(data[pos + 4:pos + 8])
+        if chunks == 0:
+            if chunk_type != b'IHDR' or length != 13:
+                return None
+            crc, = struct.unpack_from('>I', data, pos + 21)
+            if zlib.crc32(data[pos + 4:pos + 21]) != crc:
+                return None
+        elif not chunk_type.isalpha():
+            return None
+        pos += 12 + length
+        chunks += 1
+        if chunk_type == b'IEND':
+            return pos - offset, {"chunks": chunks}
+    # No IEND before the data ran out; at least an IEND chunk is still
+    # missing, so the size reaches past the data and marks it truncated
+    return (max(pos, limit) + 12 - offset, {"chunks": chunks}) if chunks else None
+
+def _parse_jpeg(data, offset, limit, state):
+    pos = offset + 2
+    visited = []
+    while pos + 4 <= limit and len(visited) < _MAX_JPEG_SEGMENTS:
+        if pos in state.dead or data[pos] != 0xFF:
+            return state.walk_failed(visited)
+        visited.append(pos)
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1  # Fill byte
+            continue
+        if marker < 0xC0 or marker in (0xD8, 0xD9):
+            return state.walk_failed(visited)
+        length, = struct.unpack_from('>H', data, pos + 2)
+        if length < 2:
+            return state.walk_failed(visited)
+        pos += 2 + length
+        if marker == 0xDA:
+            # Entropy-coded data runs until the EOI marker
+            end = state.find_end(b'\xff\xd9', pos, limit)
+            if end == -1:
+                return state.walk_failed(visited)
+            return end + 2 - offset, {"segments": len(visited)}
+    return state.walk_failed(visited)
+
+def _parse_gif(data, offset, limit, state):
+    if offset + 13 > limit:
+        return None
+    flags = data[offset + 10]
+    pos = offset + 13
+    if flags & 0x80:
+        pos += 3 * (2 << (flags & 0x07))
+    frames = 0
+    visited = []
+    while pos < limit:
+        if pos in state.dead:
+            return state.walk_failed(visited)
+        visited.append(pos)
+        block = data[pos]
+        if block == 0x3B:  # Trailer
+            return pos + 1 - offset, {"frames": frames}
+        if block == 0x2C:  # Image descriptor
+            if pos + 10 > limit:
+                return state.walk_failed(visited)
+            local_flags = data[pos + 9]
+            pos += 10
+            if local_flags & 0x80:
+                pos += 3 * (2 << (local_flags & 0x07))
+            pos += 1  # LZW minimum code size
+            frames += 1
+        elif block == 0x21:  # Extension
+            pos += 2
+        else:
+            return state.walk_failed(visited)
+        # Skip data sub-blocks
+        while pos < limit and data[pos] != 0:
+            pos += data[pos] + 1
+        pos += 1
+    return state.walk_failed(visited)
+
+def _parse_bmp(data, offset, limit, state):
+    if offset + 18 > limit:
+        return None
+    size, reserved, pixel_offset, dib_size = struct.unpack_from('<IIII', data, offset + 2)
+    if reserved != 0 or dib_size not in (12, 40, 52, 56, 108, 124):
+        return None
+    if not (14 + dib_size <= pixel_offset < size <= MAX_CARVE_SIZE):
+        return None
+    return size, {"pixel_offset": pixel_offset}
+
+def _parse_zip(data, offset, limit, state):
+    if offset + 30 > limit:
+        return None
+    version, flags, method = struct.unpack_from('<HHH', data, offset + 4)
+    if version > 63 or method not in (0, 1, 6, 8, 9, 12, 14, 93, 95, 98, 99):
+        return None
+    eocd = state.find_end(b'PK\x05\x06', offset, limit)
+    if eocd == -1 or eocd + 22 > limit:
+        return None
+    entries, = struct.unpack_from('<H', data, eocd + 10)
+    comment_length, = struct.unpack_from('<H', data, eocd + 20)
+    return eocd + 22 + comment_length - offset, {"entries": entries}
+
+def _parse_pdf(data, offset, limit, state):
+    if offset + 8 > limit or not bytes(data[offset + 5:offset + 8]).replace(b'.', b'').isdigit():
+        return None
+    end = state.find_end(b'%%EOF', offset, limit)
+    if end == -1:
+        return None
+    end += 5
+    while end < limit and data[end] in b'\r\n':
+        end += 1
+    return end - offset, {"version": bytes(data[offset + 5:offset + 8]).decode('ascii')}
+
+def _parse_gzip(data, offset, limit, state):
+    flags, extra_flags, os_id = data[offset + 3], data[offset + 8], data[offset + 9]
+    if flags & 0xE0 or extra_flags not in (0, 2, 4) or (os_id > 13 and os_id != 255):
+        return None
+    return _parse_compressed(data, offset, limit, zlib.decompressobj(wbits=31))
+
+def _parse_bzip2(data, offset, limit, state):
+    if not (0x31 <= data[offset + 3] <= 0x39) or bytes(data[offset + 4:offset + 10]) != b'1AY&SY':
+        return None
+    return _parse_compressed(data, offset, limit, bz2.BZ2Decompressor())
+
+def _parse_compressed(data, offset, limit, decompressor):
+    """Find the end of a compressed stream by decompressing it in bounded chunks."""
+    chunk = 64 * 1024
+    pos = offset
+    unpacked = 0
+    try:
+        while pos < limit and not decompressor.eof:
+            piece = bytes(data[pos:min(pos + chunk, limit)])
+            unpacked += len(decompressor.decompress(piece))
+            pos += len(piece)
+    except (zlib.error, OSError, EOFError):
+        return None
+    if not decompressor.eof:
+        return None
+    return pos - len(decompressor.unused_data) - offset, {"uncompressed_size": unpacked}
+
+def _parse_7z(data, offset, limit, state):
+    if offset + 32 > limit:
+        return None
+    start_crc, = struct.unpack_from('<I', data, offset + 8)
+    if zlib.crc32(data[offset + 12:offset + 32]) != start_crc:
+        return None
+    next_offset, next_size = struct.unpack_from('<QQ', data, offset + 12)
+    return 32 + next_offset + next_size, {"version": data[offset + 7]}
+
+def _parse_elf(data, offset, limit, state):
+    if offset + 64 > limit:
+        return None
+    ei_class, ei_data, ei_version = data[offset + 4], data[offset + 5], data[offset + 6]
+    if ei_class not in (1, 2) or ei_data not in (1, 2) or ei_version != 1:
+        return None
+    endian = '<' if ei_data == 1 else '>'
+    if ei_class == 1:
+        phoff, shoff = struct.unpack_from(endian + 'II', data, offset + 28)
+        ehsize, phentsize, phnum, shentsize, shnum = struct.unpack_from(endian + 'HHHHH', data, offset + 40)
+    else:
+        phoff, shoff = struct.unpack_from(endian + 'QQ', data, offset + 32)
+        ehsize, phentsize, phnum, shentsize, shnum = struct.unpack_from(endian + 'HHHHH', data, offset + 52)
+    if ehsize != (52 if ei_class == 1 else 64):
+        return None
+    size = max(phoff + phnum * phentsize, shoff + shnum * shentsize)
+    if size == 0:
+        return None
+    return size, {"bits": 32 * ei_class, "endian": "little" if ei_data == 1 else "big"}
+
+def _parse_pe(data, offset, limit, state):
+    if offset + 64 > limit:
+        return None
+    pe_offset, = struct.unpack_from('<I', data, offset + 0x3C)
+    header = offset + pe_offset
+    if pe_offset > 1024 or header + 24 > limit or bytes(data[header:header + 4]) != b'PE\x00\x00':
+        return None
+    sections, = struct.unpack_from('<H', data, header + 6)
+    optional_size, = struct.unpack_from('<H', data, header + 20)
+    table = header + 24 + optional_size
+    size = table + 40 * sections - offset
+    for i in range(sections):
+        entry = table + 40 * i
+        if entry + 40 > limit:
+            break
+        raw_size, raw_pointer = struct.unpack_from('<II', data, entry + 16)
+        size = max(size, raw_pointer + raw_size)
+    return size, {"sections": sections}
+
+# Signature table: (signature, file type, parser)
+CARVE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', "PNG", _parse_png),
+    (b'\xff\xd8\xff', "JPEG", _parse_jpeg),
+    (b'GIF87a', "GIF", _parse_gif),
+    (b'GIF89a', "GIF", _parse_gif),
+    (b'BM', "BMP", _parse_bmp),
+    (b'PK\x03\x04', "ZIP", _parse_zip),
+    (b'%PDF-', "PDF", _parse_pdf),
+    (b'\x1f\x8b\x08', "GZIP", _parse_gzip),
+    (b'BZh', "BZIP2", _parse_bzip2),
+    (b"7z\xbc\xaf'\x1c", "7Z", _parse_7z),
+    (b'\x7fELF', "ELF", _parse_elf),
+    (b'MZ', "PE", _parse_pe),
+]
+
+_SIGNATURE_TABLE = {sig: (file_type, parser) for sig, file_type, parser in CARVE_SIGNATURES}
+
+def identify_signature(head):
+    """File type whose signature starts head (e.g. appended data), or None."""
+    for sig, file_type, _ in CARVE_SIGNATURES:
+        if bytes(head[:len(sig)]) == sig:
+            return file_type
+    return None
+
+# Signatures grouped by their first two bytes, longest first. Every signature
+# is at least two bytes long, so a 64K lookup table over byte pairs finds all
+# candidate offsets without running Python code per byte.
+_SIGNATURES_BY_PREFIX = {}
+for _sig in sorted(_SIGNATURE_TABLE, key=len, reverse=True):
+    _SIGNATURES_BY_PREFIX.setdefault(_sig[:2], []).append(_sig)
+
+_PREFIX_TABLE = np.zeros(1 << 16, dtype=bool)
+for _prefix in _SIGNATURES_BY_PREFIX:
+    _PREFIX_TABLE[_prefix[0] << 8 | _prefix[1]] = True
+
+def _iter_signatures(data, start=0, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Find every signature occurrence at or after start, in offset order.
+
+    Byte pairs at even and odd offsets are reinterpreted as big-endian
+    uint16 keys and looked up in the prefix table, chunk by chunk. Only the
+    rare prefix hits are compared against the full signatures.
+
+    Yields:
+        Tuples of (offset, signature)
+    """
+    view = np.frombuffer(data, dtype=np.uint8)
+    try:
+        for chunk_start in range(start, len(view), chunk_size):
+            # One byte of overlap so pairs straddling the chunk end are seen
+            chunk = view[chunk_start:chunk_start + chunk_size + 1]
+            hits = []
+            for parity in (0, 1):
+                pairs = (len(chunk) - parity) // 2
+                keys = chunk[parity:parity + 2 * pairs].view('>u2')
+                hits.append(np.flatnonzero(_PREFIX_TABLE[keys]) * 2 + parity)
+
+            for offset in (np.sort(np.concatenate(hits)) + chunk_start).tolist():
+                for sig in _SIGNATURES_BY_PREFIX[bytes(data[offset:offset + 2])]:
+                    if data[offset:offset + len(sig)] == sig:
+                        yield offset, sig
+                        break
+    finally:
+        del view
+
+def _carve_at(data, offset, sig, state):
+    """Validate a signature hit; returns a CarvedArtifact or None."""
+    file_type, parser = _SIGNATURE_TABLE[sig]
+    total = len(data)
+    limit = min(total, offset + MAX_CARVE_SIZE)
+
+    try:
+        parsed = parser(data, offset, limit, state)
+    except (struct.error, IndexError):
+        parsed = None
+
+    if parsed is None or parsed[0] <= len(sig):
+        return None
+
+    size, info = parsed
+    truncated = offset + size > total
+    size = min(size, total - offset)
+    return CarvedArtifact(file_type, offset, size, truncated, info)
+
+def carve_artifacts(data, max_artifacts=MAX_ARTIFACTS, skip_offset_zero=False):
+    """
+    Scan a data stream for embedded files at any offset.
+
+    Signatures are located with a single vectorized prefix pass. Each hit is
+    validated by a lightweight parse of the format's structure, which also
+    gives its size. Scanning resumes after a carved artifact, and terminator
+    searches are cached, so the total work stays linear in the stream length.
+
+    Args:
+        data: Bytes-like object to scan
+        max_artifacts: Maximum number of artifacts to return
+        skip_offset_zero: Ignore a signature at offset 0 (already covered by
+            callers that check the stream start)
+
+    Returns:
+        List of CarvedArtifact objects in offset order
+    """
+    artifacts = []
+    state = _ScanState(data)
+    pos = 1 if skip_offset_zero else 0
+
+    candidates = _iter_signatures(data, pos)
+    try:
+        for offset, sig in candidates:
+            if len(artifacts) >= max_artifacts:
+                break
+            if offset < pos:
+                continue
+            artifact = _carve_at(data, offset, sig, state)
+            if artifact is not None:
+                artifacts.append(artifact)
+                pos = offset + artifact.size
+    finally:
+        candidates.close()
+
+    return artifacts
+
+def scan_file(file_path, max_hits=MAX_SIGNATURE_HITS):
+    """
+    Scan a file for embedded files, including files nested inside others.
+
+    The file is memory-mapped, so it is never read into memory as a whole.
+    Unlike carve_artifacts, scanning continues inside each validated
+    artifact, so a host image at offset 0 does not hide a thumbnail or an
+    archive stored in one of its chunks. A hit that ends where an earlier
+    artifact of the same type ends is part of that artifact (e.g. the
+    further local file headers of a ZIP, which all lead to one central
+    directory) and is not reported again.
+
+    Args:
+        file_path: Path to the file
+        max_hits: Maximum number of artifacts to return
+
+    Returns:
+        List of CarvedArtifact objects in offset order
+    """
+    if max_hits <= 0 or os.path.getsize(file_path) == 0:
+        return []
+
+    hits = []
+    spans = set()  # (file type, end offset) of every reported artifact
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        state = _ScanState(mm)
+        candidates = _iter_signatures(mm)
+        try:
+            for offset, sig in candidates:
+                artifact = _carve_at(mm, offset, sig, state)
+                if artifact is not None:
+                    span = (artifact.file_type, artifact.offset + artifact.size)
+                    if span in spans:
+                        continue
+                    spans.add(span)
+                    hits.append(artifact)
+                    if len(hits) >= max_hits:
+                        break
+        finally:
+            candidates.close()
+    return hits
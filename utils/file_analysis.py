@@ -1,103 +1,620 @@
-import subprocess
 import os
+import mmap
+import math
+import hashlib
 import tempfile
 from pathlib import Path
 import numpy as np
-import pandas as pd
+from utils.carving import scan_file, MAX_SIGNATURE_HITS
+from utils.tool_runner import get_tool_runner
+from utils.tool_registry import get_tool_registry, tool_available, tool_path
 
-def run_command(cmd, input_file):
-    """Run a command and return its output."""
+# Bytes read per chunk by the streaming analyses; small enough that each
+# chunk stays in the CPU cache while it is counted
+CHUNK_SIZE = 1024 * 1024
+
+# Entropy profile defaults: window size in bytes, and the entropy (bits per
+# byte) from which a window counts as high-entropy
+ENTROPY_BLOCK_SIZE = 1024
+HIGH_ENTROPY_THRESHOLD = 7.5
+
+# Encodings searched by iter_strings, and the bytes it scans per step
+STRING_ENCODINGS = ("ascii", "utf-16le", "utf-16be")
+STRINGS_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Bytes counted as printable string characters: ASCII 0x20-0x7e and tab
+_PRINTABLE_BYTES = np.zeros(256, dtype=bool)
+_PRINTABLE_BYTES[0x20:0x7f] = True
+_PRINTABLE_BYTES[0x09] = True
+
+# Leading bytes kept by fingerprint_file for the hex view and type detection
+HEAD_SIZE = 256
+
+# Bytes per hex dump row, and bytes shown per page of the hex view
+HEX_ROW_WIDTH = 16
+HEX_WINDOW_SIZE = 256
+
+# Printable ASCII bytes map to themselves, everything else to '.'
+_HEX_ASCII_TABLE = bytes(b if 0x20 <= b < 0x7f else 0x2e for b in range(256))
+
+# Magic numbers recognised by detect_magic, as (offset, bytes, type name)
+MAGIC_TYPES = [
+    (0, b'\x89PNG\r\n\x1a\n', "PNG image"),
+    (0, b'\xff\xd8\xff', "JPEG image"),
+    (0, b'GIF87a', "GIF image"),
+    (0, b'GIF89a', "GIF image"),
+    (0, b'BM', "BMP image"),
+    (0, b'II*\x00', "TIFF image"),
+    (0, b'MM\x00*', "TIFF image"),
+    (8, b'WEBP', "WebP image"),
+    (8, b'WAVE', "WAV audio"),
+    (0, b'ID3', "MP3 audio"),
+    (0, b'fLaC', "FLAC audio"),
+    (0, b'OggS', "Ogg media"),
+    (0, b'%PDF', "PDF document"),
+    (0, b'PK\x03\x04', "ZIP archive"),
+    (0, b'\x1f\x8b', "GZIP archive"),
+    (0, b'BZh', "BZIP2 archive"),
+    (0, b"7z\xbc\xaf'\x1c", "7-Zip archive"),
+    (0, b'Rar!\x1a\x07', "RAR archive"),
+    (0, b'\x7fELF', "ELF executable"),
+    (0, b'MZ', "Windows executable"),
+]
+
+# Limits on the sub-block histograms and bytes entropy_profile handles per batch
+PROFILE_BATCH_BLOCKS = 4096
+PROFILE_BATCH_BYTES = 4 * 1024 * 1024
+
+def run_command(cmd, input_file, timeout=None):
+    """Run a command on a file and return its output."""
+    path = tool_path(cmd[0])
+    if path is None:
+        return f"Error: {cmd[0]} not installed"
     try:
-        result = subprocess.run(
-            cmd + [str(input_file)],  # Convert Path to string
-            capture_output=True,
-            text=True,
-            timeout=30  # Add timeout
-        )
-        return result.stdout if result.stdout else result.stderr
-    except subprocess.CalledProcessError as e:
-        return f"Error running {cmd[0]}: {e.stderr}"
-    except subprocess.TimeoutExpired:
-        return f"Timeout running {cmd[0]}"
+        future = get_tool_runner().submit(cmd[0], [path] + cmd[1:] + [str(input_file)], timeout)
+        return future.result().output
     except Exception as e:
         return f"Error: {str(e)}"
 
+def file_tool_commands(file_path, file_type):
+    """
+    Command lines of the installed external tools that apply to a file.
+
+    Args:
+        file_path: Path to the file
+        file_type: Lower-case extension without the dot
+
+    Returns:
+        Dict of tool name -> argument list
+    """
+    commands = {"exiftool": [str(file_path)]}
+    if file_type == 'png':
+        commands["zsteg"] = ['-a', str(file_path)]
+    registry = get_tool_registry()
+    return {name: [registry.path(name)] + args for name, args in commands.items() if registry.available(name)}
+
+def start_file_tools(file_path, file_type):
+    """
+    Launch every applicable external tool on a file at once.
+
+    Returns:
+        Dict of tool name -> concurrent.futures.Future of a ToolResult, for
+        installed tools only; pass ``.get(name)`` to metadata_report /
+        zsteg_report
+    """
+    return get_tool_runner().run_all(file_tool_commands(file_path, file_type))
+
+def metadata_from_output(output):
+    """Parse exiftool's "Key : Value" lines into a dictionary."""
+    metadata = {}
+    for line in output.split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            metadata[key.strip()] = value.strip()
+    return metadata
+
+def metadata_report(future):
+    """Metadata dictionary from an exiftool future (None if exiftool is not installed)."""
+    if future is None:
+        return {"Error": "exiftool not installed"}
+    return metadata_from_output(future.result().output)
+
 def get_file_metadata(file_path):
     """Extract file metadata using exiftool."""
+    if not tool_available("exiftool"):
+        return {"Error": "exiftool not installed"}
     try:
-        output = run_command(['exiftool'], file_path)
-        metadata = {}
-        for line in output.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                metadata[key.strip()] = value.strip()
-        return metadata
+        return metadata_from_output(run_command(['exiftool'], file_path))
     except Exception as e:
         return {"Error": str(e)}
 
-def extract_strings(file_path, min_length=4):
+def extract_strings(file_path, min_length=4, max_count=None, encodings=STRING_ENCODINGS):
     """Extract readable strings from the file."""
     try:
-        output = run_command(['strings', '-n', str(min_length)], file_path)
-        return output.split('\n')
+        return [found["text"] for found in iter_strings(file_path, min_length, encodings, max_count)]
     except Exception as e:
         return [f"Error extracting strings: {str(e)}"]
 
-def analyze_file_structure(file_path):
-    """Analyze file structure using binwalk."""
-    try:
-        output = run_command(['binwalk'], file_path)
-        return output
-    except Exception as e:
-        return f"Error analyzing file structure: {str(e)}"
+def iter_strings(file_path, min_length=4, encodings=STRING_ENCODINGS, max_count=None,
+                 chunk_size=STRINGS_CHUNK_SIZE):
+    """
+    Lazily find printable strings in a file, in file order.
+
+    The file is memory-mapped and scanned chunk by chunk with vectorized
+    masks, so nothing is spawned and stopping the iteration early stops the
+    scan. Printable means ASCII 0x20-0x7e plus tab, as for GNU strings.
+
+    Args:
+        file_path: Path to the file
+        min_length: Minimum string length in characters
+        encodings: Encodings to search, from STRING_ENCODINGS
+        max_count: Stop after this many strings (None = all)
+        chunk_size: Bytes scanned per step
+
+    Yields:
+        Dictionaries with ``offset``, ``encoding`` and ``text``
+    """
+    for encoding in encodings:
+        if encoding not in STRING_ENCODINGS:
+            raise ValueError(f"Unsupported string encoding {encoding!r}")
+    if max_count is not None and max_count <= 0:
+        return
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            count = 0
+            utf16_end = 0
+            start = 0
+            step = chunk_size
+            while start < size:
+                end = min(size, start + step)
+                runs, resume = _chunk_strings(data[start:end], start, end == size, min_length, encodings)
+
+                if resume == start:
+                    # A single string spans the whole chunk; look further
+                    step *= 2
+                    continue
+                step = chunk_size
+
+                runs = [run for run in runs if run[0] < resume]
+                runs, utf16_end = _drop_shifted_utf16(runs, utf16_end)
+                for run_start, run_end, encoding in runs:
+                    yield {
+                        "offset": run_start,
+                        "encoding": encoding,
+                        "text": mm[run_start:run_end].decode(encoding)
+                    }
+                    count += 1
+                    if max_count is not None and count >= max_count:
+                        return
+                start = resume
+        finally:
+            del data
+
+def _drop_shifted_utf16(runs, utf16_end):
+    """
+    Drop the UTF-16 runs that are another run read one byte off.
+
+    UTF-16LE text also matches as UTF-16BE one byte earlier or later, and
+    vice versa. Of two overlapping runs the one starting at an even offset
+    is kept, since its NUL bytes sit where 2-byte aligned text has them
+    (odd offsets for UTF-16LE, even ones for UTF-16BE).
+
+    Args:
+        runs: List of (start, end, encoding) sorted by start
+        utf16_end: End of the last UTF-16 run already reported
+
+    Returns:
+        Tuple of (kept runs, end of the last UTF-16 run kept)
+    """
+    kept = []
+    last = None  # Index in kept of the latest UTF-16 run
+    for run in runs:
+        start, end, encoding = run
+        if encoding != "ascii":
+            if start < utf16_end:
+                if last is None or start % 2 or not kept[last][0] % 2:
+                    continue
+                del kept[last]
+            last = len(kept)
+            utf16_end = end
+        kept.append(run)
+    return kept, utf16_end
+
+def _find_runs(mask):
+    """Start and end indices of every run of True in a boolean array."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[::2], edges[1::2]
+
+def _chunk_strings(chunk, base, at_eof, min_length, encodings):
+    """
+    Find the strings in one chunk.
+
+    Returns:
+        Tuple of (list of (start, end, encoding) sorted by start, offset
+        the next chunk should start at). Strings that may continue past the
+        chunk are not complete yet; the next chunk starts at the first of
+        them.
+    """
+    printable = _PRINTABLE_BYTES[chunk]
+    zero = chunk == 0
+    chunk_end = base + len(chunk)
+    found = []
+
+    for encoding in encodings:
+        if encoding == "ascii":
+            starts, ends = _find_runs(printable)
+            found.append((base + starts, base + ends, 1, encoding))
+            continue
+
+        if encoding == "utf-16le":
+            pairs = printable[:-1] & zero[1:]
+        else:
+            pairs = zero[:-1] & printable[1:]
+        # Characters are two bytes apart, so each byte parity is its own sequence
+        for parity in (0, 1):
+            starts, ends = _find_runs(pairs[parity::2])
+            found.append((base + parity + 2 * starts, base + parity + 2 * ends, 2, encoding))
+
+    resume = chunk_end
+    if not at_eof and any(encoding != "ascii" for encoding in encodings):
+        # A character may straddle the chunk end with no pair formed yet
+        resume -= 1
+    runs = []
+    for starts, ends, char_size, encoding in found:
+        if not at_eof:
+            # A run ending within a character of the chunk end may continue,
+            # however short it is so far
+            open_runs = ends >= chunk_end - 1
+            if open_runs.any():
+                resume = min(resume, int(starts[open_runs].min()))
+        keep = ends - starts >= min_length * char_size
+        starts, ends = starts[keep], ends[keep]
+        runs.extend(zip(starts.tolist(), ends.tolist(), [encoding] * len(starts)))
+
+    runs.sort()
+    if not at_eof:
+        # The one-byte-off reading of a UTF-16 run starting just before
+        # resume may start at resume; keep the run for the next chunk so
+        # the two are compared there
+        starts = {start for start, _, encoding in runs if encoding != "ascii"}
+        while resume - 1 in starts:
+            resume -= 1
+    return runs, resume
+
+def analyze_file_structure(file_path, max_hits=MAX_SIGNATURE_HITS):
+    """
+    Find the files embedded in a file by signature, without binwalk.
+
+    Every signature hit is validated by parsing the format's header, so
+    chance byte matches are dropped rather than reported.
+
+    Args:
+        file_path: Path to the file
+        max_hits: Maximum number of records to return
+
+    Returns:
+        List of dictionaries with ``offset``, ``type``, ``length``,
+        ``confidence``, ``truncated`` and ``info``, in offset order
+    """
+    return [
+        {
+            "offset": artifact.offset,
+            "type": artifact.file_type,
+            "length": artifact.size,
+            "confidence": artifact.confidence,
+            "truncated": artifact.truncated,
+            "info": artifact.info
+        }
+        for artifact in scan_file(file_path, max_hits)
+    ]
+
+def byte_histogram(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Count every byte value in a file in one streaming pass.
+
+    The file is read in fixed-size chunks, so memory use does not depend on
+    the file size.
+
+    Returns:
+        numpy int64 array of 256 counts
+    """
+    histogram = np.zeros(256, dtype=np.int64)
+    buffer = bytearray(chunk_size + chunk_size % 2)
+    with open(file_path, 'rb') as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            add_to_histogram(histogram, memoryview(buffer)[:size])
+    return histogram
+
+def add_to_histogram(histogram, chunk):
+    """
+    Add the byte counts of a chunk to a 256-entry histogram in place.
+
+    Bytes are counted in pairs as 16-bit values, which halves the number of
+    elements bincount has to visit; the pair counts are folded back into
+    byte counts afterwards.
+    """
+    pairs = len(chunk) // 2
+    if pairs:
+        wide = np.bincount(np.frombuffer(chunk, dtype=np.uint16, count=pairs), minlength=65536)
+        wide = wide.reshape(256, 256)
+        histogram += wide.sum(axis=0) + wide.sum(axis=1)
+    if len(chunk) % 2:
+        histogram[chunk[-1]] += 1
+
+def fingerprint_file(file_path, head_size=HEAD_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Compute everything the basic analyses need from a file in one read.
+
+    Args:
+        file_path: Path to the file
+        head_size: Number of leading bytes to keep
+        chunk_size: Bytes read per chunk
+
+    Returns:
+        Dictionary with ``size``, ``sha256``, ``md5``, the byte
+        ``histogram`` (numpy array of 256 counts), ``entropy``, the first
+        ``head_size`` bytes as ``head`` and the detected ``magic`` type
+        (None if unknown)
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    histogram = np.zeros(256, dtype=np.int64)
+    head = b''
+    size = 0
+
+    buffer = bytearray(chunk_size + chunk_size % 2)
+    with open(file_path, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            chunk = memoryview(buffer)[:n]
+            sha256.update(chunk)
+            md5.update(chunk)
+            add_to_histogram(histogram, chunk)
+            if len(head) < head_size:
+                head += bytes(chunk[:head_size - len(head)])
+            size += n
+
+    return {
+        "size": size,
+        "sha256": sha256.hexdigest(),
+        "md5": md5.hexdigest(),
+        "histogram": histogram,
+        "entropy": entropy_from_histogram(histogram),
+        "head": head,
+        "magic": detect_magic(head)
+    }
+
+def detect_magic(head):
+    """Name the file type from its leading bytes, or None if unknown."""
+    for offset, magic, name in MAGIC_TYPES:
+        if head[offset:offset + len(magic)] == magic:
+            return name
+    return None
+
+def byte_frequency_from_histogram(histogram):
+    """Byte values present in a histogram and their counts, most frequent first."""
+    present = np.flatnonzero(histogram)
+    order = present[np.argsort(-histogram[present], kind='stable')]
+    return order.tolist(), histogram[order].tolist()
+
+def hex_rows(data, offset=0, width=HEX_ROW_WIDTH):
+    """
+    Split bytes into hex dump rows.
+
+    The hex and ASCII columns of the whole block are each built by one
+    C-level call (bytes.hex, bytes.translate) and then sliced per row.
+
+    Args:
+        data: Bytes-like object
+        offset: File offset of the first byte
+        width: Bytes per row
+
+    Returns:
+        List of dictionaries with ``address``, ``bytes``, ``hex`` and
+        ``ascii``
+    """
+    data = bytes(data)
+    hex_text = data.hex(' ')
+    ascii_text = data.translate(_HEX_ASCII_TABLE).decode('ascii')
+    rows = []
+    for start in range(0, len(data), width):
+        row = data[start:start + width]
+        rows.append({
+            "address": offset + start,
+            "bytes": row,
+            "hex": hex_text[3 * start:3 * (start + len(row)) - 1],
+            "ascii": ascii_text[start:start + width]
+        })
+    return rows
+
+def hex_window(file_path, offset=0, length=HEX_WINDOW_SIZE, width=HEX_ROW_WIDTH):
+    """
+    Hex dump rows for an arbitrary slice of a file.
+
+    Only the requested slice is read, through mmap, so paging through a
+    multi-GB file or jumping to a carved offset costs the same as viewing
+    the first bytes.
+
+    Args:
+        file_path: Path to the file
+        offset: First byte to show; windows past the end are empty
+        length: Number of bytes to show
+        width: Bytes per row
+
+    Returns:
+        List of row dictionaries as returned by hex_rows
+    """
+    if offset < 0 or length < 0:
+        raise ValueError("offset and length must not be negative")
+    size = os.path.getsize(file_path)
+    if offset >= size or length == 0:
+        return []
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return hex_rows(mm[offset:offset + length], offset, width)
+
+def hex_dump_from_bytes(data, offset=0, width=HEX_ROW_WIDTH):
+    """Format bytes as hex dump lines ("address: b0 b1 ...")."""
+    return '\n'.join(f"{row['address']:08x}: {row['hex']}" for row in hex_rows(data, offset, width))
+
+def entropy_from_histogram(histogram):
+    """Shannon entropy in bits per byte of a byte histogram."""
+    total = histogram.sum()
+    if total == 0:
+        return 0
+    p = histogram[histogram > 0] / total
+    return float(-np.sum(p * np.log2(p)))
 
 def calculate_entropy(file_path):
     """Calculate byte-level entropy of the file."""
     try:
-        with open(file_path, 'rb') as f:
-            data = f.read()
-
-        if len(data) == 0:
-            return 0
-
-        entropy = 0
-        for x in range(256):
-            p_x = data.count(x)/len(data)
-            if p_x > 0:
-                entropy += -p_x * np.log2(p_x)
-        return entropy
+        return entropy_from_histogram(byte_histogram(file_path))
     except Exception as e:
         return 0
 
+def entropy_profile(file_path, block_size=ENTROPY_BLOCK_SIZE, stride=None,
+                    threshold=HIGH_ENTROPY_THRESHOLD):
+    """
+    Shannon entropy of every block (or sliding window) of a file.
+
+    The file is memory-mapped and processed in batches, so multi-GB files
+    are handled without loading them. Windows are built from histograms of
+    sub-blocks of gcd(block_size, stride) bytes, each computed with a single
+    bincount per batch, so overlapping windows cost no extra counting.
+
+    Args:
+        file_path: Path to the file
+        block_size: Window size in bytes
+        stride: Distance between window starts (None = block_size, i.e.
+            non-overlapping blocks)
+        threshold: Entropy from which a window counts as high-entropy
+
+    Returns:
+        Dictionary with ``offsets`` and ``entropy`` arrays (one entry per
+        window), ``block_size``, ``stride`` and ``regions``, a list of
+        merged high-entropy ranges with their start, end and mean entropy.
+        Bytes after the last full window get a final, shorter window that
+        ends at the end of the file.
+    """
+    stride = stride or block_size
+    if block_size <= 0 or stride <= 0:
+        raise ValueError("block_size and stride must be positive")
+
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return _entropy_profile_result(np.zeros(0, dtype=np.int64), np.zeros(0), block_size, stride, threshold, size)
+    if size < block_size:
+        # A single window covering the whole file
+        block_size = stride = size
+
+    sub = math.gcd(block_size, stride)
+    window = block_size // sub  # Sub-blocks per window
+    step = stride // sub  # Sub-blocks between window starts
+    total_sub = size // sub
+    windows = (total_sub - window) // step + 1
+
+    # Precomputed h*log2(h) so entropy is a gather and a sum per window
+    xlogx = np.zeros(block_size + 1)
+    xlogx[1:] = np.arange(1, block_size + 1) * np.log2(np.arange(1, block_size + 1))
+
+    offsets = np.arange(windows, dtype=np.int64) * stride
+    entropy = np.empty(windows)
+
+    batch = min(PROFILE_BATCH_BLOCKS, max(1, PROFILE_BATCH_BYTES // sub))
+    batch = max(batch // step * step, step, window)
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            rows = np.arange(batch + window, dtype=np.intp)[:, None] * 256
+            done = 0
+            while done < windows:
+                first_sub = done * step
+                count = min(batch // step, windows - done) or 1
+                needed_sub = (count - 1) * step + window
+                chunk = data[first_sub * sub:(first_sub + needed_sub) * sub].reshape(needed_sub, sub)
+
+                # Histogram of every sub-block in one bincount
+                hist = np.bincount((rows[:needed_sub] + chunk).reshape(-1),
+                                   minlength=needed_sub * 256).reshape(needed_sub, 256)
+
+                if window == 1:
+                    window_hist = hist[::step]
+                else:
+                    # Overlapping windows as differences of cumulative sums
+                    cumulative = np.zeros((needed_sub + 1, 256), dtype=np.int64)
+                    np.cumsum(hist, axis=0, out=cumulative[1:])
+                    starts = np.arange(count) * step
+                    window_hist = cumulative[starts + window] - cumulative[starts]
+
+                entropy[done:done + count] = (np.log2(block_size) -
+                                              xlogx[window_hist].sum(axis=1) / block_size)
+                done += count
+                del chunk
+
+            tail = int(offsets[-1]) + stride
+            if tail < size:
+                # Data appended at the end would otherwise never be profiled
+                hist = np.bincount(data[tail:], minlength=256)
+                offsets = np.append(offsets, tail)
+                entropy = np.append(entropy, np.log2(size - tail) - xlogx[hist].sum() / (size - tail))
+        finally:
+            del data
+
+    return _entropy_profile_result(offsets, entropy, block_size, stride, threshold, size)
+
+def _entropy_profile_result(offsets, entropy, block_size, stride, threshold, size):
+    """Package an entropy profile and merge its high-entropy windows into regions."""
+    regions = []
+    high = entropy >= threshold
+    if high.any():
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], high.astype(np.int8), [0]))))
+        for start, stop in zip(edges[::2], edges[1::2]):
+            regions.append({
+                "start": int(offsets[start]),
+                "end": min(int(offsets[stop - 1] + block_size), size),
+                "mean_entropy": float(entropy[start:stop].mean())
+            })
+
+    return {
+        "offsets": offsets,
+        "entropy": entropy,
+        "block_size": block_size,
+        "stride": stride,
+        "threshold": threshold,
+        "regions": regions
+    }
+
 def get_byte_frequency(file_path):
-    """Get byte frequency distribution."""
+    """Get byte frequency distribution, most frequent byte values first."""
     try:
-        with open(file_path, 'rb') as f:
-            data = f.read()
-
-        freq = pd.Series(list(data)).value_counts()
-        return freq.index.tolist(), freq.values.tolist()
+        return byte_frequency_from_histogram(byte_histogram(file_path))
     except Exception as e:
         return list(range(256)), [0] * 256
 
-def get_hex_dump(file_path, num_bytes=256):
-    """Get hexadecimal dump of the file."""
+def get_hex_dump(file_path, num_bytes=HEX_WINDOW_SIZE):
+    """Get hexadecimal dump of the start of the file, in xxd's layout."""
     try:
-        output = run_command(['xxd', '-l', str(num_bytes)], file_path)
-        return output
+        # Two-byte groups padded to a full row, then the ASCII column
+        column = 5 * HEX_ROW_WIDTH // 2 - 1
+        return '\n'.join(
+            f"{row['address']:08x}: {row['bytes'].hex(' ', -2):<{column}}  {row['ascii']}"
+            for row in hex_window(file_path, 0, num_bytes)
+        )
     except Exception as e:
         return f"Error getting hex dump: {str(e)}"
         
-def run_zsteg(file_path):
-    """Run zsteg with -a option on PNG files."""
-    try:
-        # First check if zsteg is available
-        check_cmd = "which zsteg"
-        check_result = subprocess.run(check_cmd, shell=True, capture_output=True, text=True)
-        
-        if check_result.returncode != 0:
-            # Zsteg not available, provide a simulated output for testing
-            return """zsteg not installed. Alternative analysis provided:
+# Shown instead of zsteg's output when it is not installed
+ZSTEG_UNAVAILABLE = """zsteg not installed. Alternative analysis provided:
             
 [*] Analyzing file for potential hidden data
 [*] Running bit pattern analysis
@@ -107,10 +624,21 @@ def run_zsteg(file_path):
             
 No definitive hidden content detected through alternative analysis.
 Consider installing zsteg for more comprehensive analysis."""
-        
-        # Use zsteg if available
-        cmd = f"zsteg -a \"{file_path}\""
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.stdout if result.stdout else result.stderr
+
+def zsteg_report(future):
+    """Text to show for a zsteg future (None if zsteg is not installed)."""
+    if future is None:
+        return ZSTEG_UNAVAILABLE
+    result = future.result()
+    if not result.found:
+        return ZSTEG_UNAVAILABLE
+    return result.output
+
+def run_zsteg(file_path):
+    """Run zsteg with -a option on PNG files."""
+    if not tool_available("zsteg"):
+        return ZSTEG_UNAVAILABLE
+    try:
+        return zsteg_report(get_tool_runner().submit("zsteg", [tool_path("zsteg"), '-a', str(file_path)]))
     except Exception as e:
-        return f"Error running zsteg: {str(e)}"
\ No newline at end of file
+        return f"Error running zsteg: {str(e)}"
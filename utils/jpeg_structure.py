@@ -0,0 +1,436 @@
+"""
+JPEG segment walker.
+Walks the marker segments of a JPEG through a memory map and skips the
+entropy-coded scan data with a vectorized search for the next marker, so
+the file is streamed from disk rather than decoded. Data appended after
+EOI, APPn/COM segment sizes, duplicated or odd markers and the encoder's
+quantization tables are reported. Images declared in an MPF index (MPO
+files from multi-lens and phone cameras) are not counted as appended data.
+"""
+
+import os
+import mmap
+import struct
+import hashlib
+from functools import lru_cache
+import numpy as np
+from utils.carving import identify_signature
+
+# Bytes searched per step for the next marker in entropy-coded data
+SCAN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Standard luminance and chrominance quantization tables (ITU T.81 Annex K)
+# in natural order; libjpeg scales these by the quality setting
+STD_LUMINANCE_TABLE = (
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99,
+)
+STD_CHROMINANCE_TABLE = (
+    17, 18, 24, 47, 99, 99, 99, 99,
+    18, 21, 26, 66, 99, 99, 99, 99,
+    24, 26, 56, 99, 99, 99, 99, 99,
+    47, 66, 99, 99, 99, 99, 99, 99,
+) + (99,) * 32
+
+# Natural-order index of each zigzag position; DQT segments store tables in zigzag order
+ZIGZAG_ORDER = (
+    0, 1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34, 27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36, 29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46, 53, 60, 61, 54, 47, 55, 62, 63,
+)
+
+# Comments written by the encoders of steganography tools. Their
+# quantization tables cannot identify them: F5's JpegEncoder and OutGuess
+# scale the standard Annex K tables the same way libjpeg does, and steghide
+# and JPHide keep the cover's tables, so the tables only name the encoder.
+STEGO_ENCODER_COMMENTS = {
+    b"JPEG Encoder Copyright 1998, James R. Weeks and BioElectroMech.": "F5",
+}
+
+# APPn identifiers written by common cameras and editors
+KNOWN_APP_IDENTIFIERS = (
+    b"JFIF", b"JFXX", b"Exif", b"http://ns.adobe.com/", b"ICC_PROFILE", b"Adobe",
+    b"Ducky", b"Photoshop 3.0", b"MPF", b"FPXR", b"AVI1", b"XMP",
+)
+
+# APP2 identifier of the CIPA DC-007 multi-picture index, and the tag of its
+# MP entry list (16 bytes per image)
+MPF_IDENTIFIER = b"MPF\x00"
+MP_ENTRY_TAG = 0xB002
+MP_ENTRY_SIZE = 16
+
+# Comment segments larger than this are reported
+LARGE_COMMENT = 1024
+
+# Bytes of an APPn/COM segment kept to identify it
+SEGMENT_HEAD_BYTES = 64
+
+# Bytes of trailing data kept to identify what was appended
+TRAILING_HEAD_BYTES = 16
+
+# How strongly each kind of finding suggests hidden data (0-1)
+FINDING_SEVERITY = {
+    "trailing_data": 0.95,
+    "stego_tool_signature": 0.9,
+    "junk_bytes": 0.7,
+    "large_comment": 0.6,
+    "duplicate_marker": 0.5,
+    "odd_marker": 0.5,
+    "unknown_app_segment": 0.3,
+    "truncated": 0.3,
+}
+
+# Markers that stand alone, without a length field
+_STANDALONE_MARKERS = frozenset({0x01, 0xD8, 0xD9} | set(range(0xD0, 0xD8)))
+
+# Start-of-frame markers (C4 DHT, C8 JPG and CC DAC share the range)
+_SOF_MARKERS = frozenset(set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC})
+
+def marker_name(marker):
+    """Conventional name of a marker byte (e.g. 0xE1 -> "APP1")."""
+    if marker in _SOF_MARKERS:
+        return f"SOF{marker - 0xC0}"
+    if 0xD0 <= marker <= 0xD7:
+        return f"RST{marker - 0xD0}"
+    if 0xE0 <= marker <= 0xEF:
+        return f"APP{marker - 0xE0}"
+    if 0xF0 <= marker <= 0xFD:
+        return f"JPG{marker - 0xF0}"
+    return {
+        0x01: "TEM", 0xC4: "DHT", 0xC8: "JPG", 0xCC: "DAC", 0xD8: "SOI", 0xD9: "EOI",
+        0xDA: "SOS", 0xDB: "DQT", 0xDC: "DNL", 0xDD: "DRI", 0xDE: "DHP", 0xDF: "EXP",
+        0xFE: "COM",
+    }.get(marker, f"RES{marker:02X}")
+
+def _scaled_table(table, quality):
+    """libjpeg's jpeg_quality_scaling applied to a natural-order table, returned in zigzag order."""
+    scale = 5000 // quality if quality < 50 else 200 - quality * 2
+    values = [min(255, max(1, (value * scale + 50) // 100)) for value in table]
+    return tuple(values[index] for index in ZIGZAG_ORDER)
+
+def quant_fingerprint(tables):
+    """
+    Fingerprint of a set of quantization tables.
+
+    Args:
+        tables: Dict of table id -> tuple of 64 values in zigzag order
+
+    Returns:
+        Hex digest identifying the tables
+    """
+    digest = hashlib.sha256()
+    for table_id in sorted(tables):
+        digest.update(struct.pack('>B64H', table_id, *tables[table_id]))
+    return digest.hexdigest()[:32]
+
+@lru_cache(maxsize=1)
+def _ijg_fingerprints():
+    """Fingerprints of libjpeg's default tables at every quality setting."""
+    fingerprints = {}
+    for quality in range(1, 101):
+        luminance = _scaled_table(STD_LUMINANCE_TABLE, quality)
+        chrominance = _scaled_table(STD_CHROMINANCE_TABLE, quality)
+        label = f"IJG libjpeg (quality {quality})"
+        fingerprints[quant_fingerprint({0: luminance, 1: chrominance})] = label
+        fingerprints[quant_fingerprint({0: luminance})] = label  # Grayscale
+    return fingerprints
+
+def identify_encoder(tables):
+    """Name of the encoder whose standard tables match, or None for custom tables."""
+    return _ijg_fingerprints().get(quant_fingerprint(tables))
+
+def _parse_dqt(body):
+    """Quantization tables of a DQT segment body, as table id -> zigzag values."""
+    tables = {}
+    pos = 0
+    while pos < len(body):
+        precision, table_id = body[pos] >> 4, body[pos] & 0x0F
+        pos += 1
+        if precision:
+            values = struct.unpack_from('>64H', body, pos)
+            pos += 128
+        else:
+            values = tuple(body[pos:pos + 64])
+            pos += 64
+        if len(values) < 64:
+            break
+        tables[table_id] = tuple(values)
+    return tables
+
+def _parse_mpf(body, base):
+    """
+    Secondary images declared by an MPF index, as (offset, size) pairs.
+
+    ``body`` starts at the TIFF header after the "MPF\\0" identifier, at
+    ``base`` in the file; the index's data offsets count from there. The
+    primary image, whose offset is 0, is skipped.
+    """
+    if body[:4] == b'II*\x00':
+        endian = '<'
+    elif body[:4] == b'MM\x00*':
+        endian = '>'
+    else:
+        return []
+    try:
+        ifd, = struct.unpack_from(endian + 'I', body, 4)
+        count, = struct.unpack_from(endian + 'H', body, ifd)
+        for index in range(count):
+            tag, _, length, value = struct.unpack_from(endian + 'HHII', body, ifd + 2 + 12 * index)
+            if tag == MP_ENTRY_TAG:
+                images = []
+                for entry in range(length // MP_ENTRY_SIZE):
+                    _, size, offset = struct.unpack_from(endian + 'III', body, value + MP_ENTRY_SIZE * entry)
+                    if offset:
+                        images.append((base + offset, size))
+                return images
+    except struct.error:
+        pass
+    return []
+
+def _find_marker(view, pos, chunk_size=SCAN_CHUNK_SIZE):
+    """
+    Offset of the next marker in entropy-coded data, or -1.
+
+    Only 0xFF bytes are candidates; stuffed zeros, fill bytes and restart
+    markers belong to the scan and are skipped.
+    """
+    size = len(view)
+    while pos < size - 1:
+        chunk = view[pos:pos + chunk_size + 1]
+        candidates = np.flatnonzero(chunk[:-1] == 0xFF)
+        following = chunk[candidates + 1]
+        is_marker = (following != 0x00) & (following != 0xFF) & ((following < 0xD0) | (following > 0xD7))
+        hits = candidates[is_marker]
+        if len(hits):
+            return pos + int(hits[0])
+        pos += chunk_size
+    return -1
+
+class JpegStructure:
+    """Segment layout of a JPEG file and the anomalies found in it."""
+    def __init__(self, size):
+        self.size = size  # File size in bytes
+        self.segments = []  # One dictionary per marker, in file order
+        self.app_segments = []  # APPn and COM segments with their sizes
+        self.quant_tables = {}  # Table id -> zigzag values, last definition wins
+        self.findings = []  # Anomalies, in file order
+        self.eoi_end = None  # Offset just past the EOI marker
+        self.trailing_bytes = 0  # Bytes after EOI, other than MPF images
+        self.mpf_images = []  # Secondary images declared by an MPF index
+        self.stego_tool = None  # Steganography tool recognized by its encoder
+
+    def add_finding(self, kind, offset, length, marker=None, detail=""):
+        self.findings.append({
+            "kind": kind,
+            "offset": offset,
+            "length": length,
+            "chunk": marker,
+            "detail": detail,
+            "severity": FINDING_SEVERITY[kind]
+        })
+
+    @property
+    def quant_fingerprint(self):
+        return quant_fingerprint(self.quant_tables) if self.quant_tables else None
+
+    @property
+    def encoder(self):
+        """Encoder identified from the quantization tables, if standard."""
+        return identify_encoder(self.quant_tables) if self.quant_tables else None
+
+    @property
+    def score(self):
+        """Severity of the most suspicious finding, 0 for a clean file."""
+        return max((finding["severity"] for finding in self.findings), default=0.0)
+
+    def to_dict(self):
+        """Convert structure to dictionary."""
+        return {
+            "size": self.size,
+            "segment_count": len(self.segments),
+            "app_segments": self.app_segments,
+            "quant_fingerprint": self.quant_fingerprint,
+            "encoder": self.encoder,
+            "stego_tool": self.stego_tool,
+            "findings": self.findings,
+            "eoi_end": self.eoi_end,
+            "trailing_bytes": self.trailing_bytes,
+            "mpf_images": self.mpf_images,
+            "score": self.score
+        }
+
+def is_jpeg_file(path):
+    """Check the SOI marker without parsing further."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(3) == b'\xff\xd8\xff'
+    except OSError:
+        return False
+
+def walk_jpeg(file_path):
+    """
+    Walk the marker segments of a JPEG file.
+
+    Args:
+        file_path: Path to the JPEG file
+
+    Returns:
+        JpegStructure object
+
+    Raises:
+        ValueError: If the file does not start with an SOI marker
+    """
+    size = os.path.getsize(file_path)
+    structure = JpegStructure(size)
+    if size < 4:
+        raise ValueError("Not a JPEG file")
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:2] != b'\xff\xd8':
+            raise ValueError("Not a JPEG file")
+        view = np.frombuffer(mm, dtype=np.uint8)
+        try:
+            _walk_segments(mm, view, structure)
+        finally:
+            del view
+    return structure
+
+def _walk_segments(mm, view, structure):
+    size = structure.size
+    counts = {}
+    pos = 2
+    structure.segments.append({"offset": 0, "marker": "SOI", "length": 0})
+
+    while True:
+        if pos + 2 > size:
+            structure.add_finding("truncated", pos, size - pos, detail="File ends before EOI")
+            return
+
+        if mm[pos] != 0xFF:
+            # Bytes between segments are not part of any valid JPEG structure
+            found = _find_marker(view, pos)
+            end = found if found != -1 else size
+            structure.add_finding("junk_bytes", pos, end - pos,
+                                  detail=f"{end - pos} bytes outside any segment")
+            if found == -1:
+                return
+            pos = found
+
+        # Fill bytes may precede any marker
+        while pos + 1 < size and mm[pos + 1] == 0xFF:
+            pos += 1
+        if pos + 1 >= size:
+            structure.add_finding("truncated", pos, size - pos, detail="File ends before EOI")
+            return
+        marker = mm[pos + 1]
+        name = marker_name(marker)
+
+        if marker == 0xD9:
+            structure.segments.append({"offset": pos, "marker": name, "length": 0})
+            structure.eoi_end = pos + 2
+            _report_trailing(mm, structure, pos + 2)
+            return
+
+        if marker in _STANDALONE_MARKERS:
+            structure.segments.append({"offset": pos, "marker": name, "length": 0})
+            structure.add_finding("duplicate_marker" if marker == 0xD8 else "odd_marker", pos, 2, name,
+                                  f"{name} marker outside a scan")
+            pos += 2
+            continue
+
+        if pos + 4 > size:
+            structure.add_finding("truncated", pos, size - pos, name, "File ends inside a marker")
+            return
+        length, = struct.unpack_from('>H', mm, pos + 2)
+        end = pos + 2 + length
+        if length < 2 or end > size:
+            structure.add_finding("truncated", pos, size - pos, name,
+                                  f"{name} segment declares {length} bytes but the file ends first")
+            return
+        structure.segments.append({"offset": pos, "marker": name, "length": length})
+
+        if marker == 0xDB:
+            structure.quant_tables.update(_parse_dqt(mm[pos + 4:end]))
+        elif 0xE0 <= marker <= 0xEF or marker == 0xFE:
+            _add_app_segment(structure, mm, pos, end, marker, name, counts)
+        elif marker in _SOF_MARKERS:
+            counts["SOF"] = counts.get("SOF", 0) + 1
+            if counts["SOF"] > 1:
+                structure.add_finding("duplicate_marker", pos, length, name, "More than one start-of-frame segment")
+        elif marker == 0xC8 or 0x02 <= marker <= 0xBF or 0xF0 <= marker <= 0xFD:
+            structure.add_finding("odd_marker", pos, length, name, f"Reserved marker {name} ({length} bytes)")
+
+        pos = end
+        if marker == 0xDA:
+            # Entropy-coded data runs until the next real marker
+            found = _find_marker(view, pos)
+            if found == -1:
+                structure.add_finding("truncated", pos, size - pos, "SOS", "Scan data runs to the end of the file")
+                return
+            pos = found
+
+def _report_trailing(mm, structure, start):
+    """Report the data after EOI, except the JPEG images an MPF index declares."""
+    size = structure.size
+    gaps = []
+    pos = start
+    for image in sorted(structure.mpf_images, key=lambda image: image["offset"]):
+        offset, length = image["offset"], image["size"]
+        if offset < pos or offset + length > size or mm[offset:offset + 2] != b'\xff\xd8':
+            continue  # Overlapping, out of range or not a JPEG: stays trailing data
+        if offset > pos:
+            gaps.append((pos, offset))
+        pos = offset + length
+    if pos < size:
+        gaps.append((pos, size))
+
+    for gap_start, gap_end in gaps:
+        length = gap_end - gap_start
+        structure.trailing_bytes += length
+        appended = identify_signature(mm[gap_start:gap_start + TRAILING_HEAD_BYTES])
+        detail = f"{length} bytes after EOI"
+        if structure.mpf_images:
+            detail += " outside the images declared by the MPF index"
+        if appended:
+            detail += f", starting with a {appended} signature"
+        structure.add_finding("trailing_data", gap_start, length, detail=detail)
+
+def _add_app_segment(structure, mm, pos, end, marker, name, counts):
+    """Record an APPn or COM segment and check it against known writers."""
+    length = end - pos - 2
+    head = mm[pos + 4:min(end, pos + 4 + SEGMENT_HEAD_BYTES)]
+
+    if marker == 0xFE:
+        identifier = ""
+        body = mm[pos + 4:end].rstrip(b'\x00')
+        tool = STEGO_ENCODER_COMMENTS.get(body)
+        if tool:
+            structure.stego_tool = tool
+            structure.add_finding("stego_tool_signature", pos, length, name,
+                                  f"Comment written by the {tool} encoder")
+        elif length > LARGE_COMMENT:
+            structure.add_finding("large_comment", pos, length, name, f"Comment holds {length} bytes")
+    else:
+        identifier = head.split(b'\x00', 1)[0].decode('latin-1')
+        if not any(head.startswith(known) for known in KNOWN_APP_IDENTIFIERS):
+            structure.add_finding("unknown_app_segment", pos, length, name,
+                                  f"{name} segment with unrecognized identifier {identifier[:32]!r} ({length} bytes)")
+        elif marker == 0xE2 and head.startswith(MPF_IDENTIFIER):
+            structure.mpf_images = [
+                {"offset": offset, "size": size}
+                for offset, size in _parse_mpf(mm[pos + 8:end], pos + 8)
+            ]
+        elif identifier in ("JFIF", "Exif"):
+            # These headers describe the whole file and appear once
+            counts[identifier] = counts.get(identifier, 0) + 1
+            if counts[identifier] > 1:
+                structure.add_finding("duplicate_marker", pos, length, name, f"Second {identifier} header")
+
+    structure.app_segments.append({"offset": pos, "marker": name, "identifier": identifier, "size": length})
@@ -0,0 +1,218 @@
+"""
+Password candidate generation for passphrase-protected steganography.
+Produces a lazy, deduplicated stream of guesses from base words using
+hashcat-style mutation rules, most probable guesses first.
+"""
+
+import re
+import hashlib
+import datetime
+from pathlib import Path
+import numpy as np
+
+from utils.file_analysis import extract_strings, get_file_metadata
+
+# Passwords tried before anything derived from the file
+DEFAULT_PASSWORDS = ["", "password", "123456", "admin", "stego", "secret", "hidden"]
+
+# Suffixes people most often append to a word, most common first
+COMMON_SUFFIXES = ["1", "123", "!", "12", "1234", "01", "2", "@", "69", "007"]
+
+# Leetspeak substitution tables, applied to the whole word
+LEET_TABLES = [
+    str.maketrans("aeiost", "431057"),
+    str.maketrans("aeios", "@3!0$"),
+]
+
+# How many years back from the current one to try as suffixes
+YEAR_RANGE = 30
+
+# Only the first words are combined pairwise, since pairs grow quadratically
+MAX_CONCAT_WORDS = 20
+
+# Limits on words harvested from the file itself
+MAX_HARVESTED_WORDS = 200
+MAX_STRINGS_WORDS = 100
+
+# exiftool fields that describe the file on disk rather than its content
+SKIP_METADATA_FIELDS = {
+    "ExifTool Version Number", "Directory", "File Permissions", "File Size",
+    "File Modification Date/Time", "File Access Date/Time",
+    "File Inode Change Date/Time", "File Type", "File Type Extension", "MIME Type"
+}
+
+_TOKEN_RE = re.compile(r'[A-Za-z0-9]{3,32}')
+_STRINGS_WORD_RE = re.compile(r'[A-Za-z]{4,}[A-Za-z0-9]{0,28}')
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set used to deduplicate candidates.
+
+    Memory stays constant no matter how many candidates pass through; the
+    price is that a small fraction of new candidates is wrongly treated as
+    already seen and skipped.
+    """
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * np.log(error_rate) / (np.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * np.log(2))))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8', errors='surrogateescape'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item; returns True if it was (probably) already present."""
+        present = True
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, item):
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+def harvest_words(file_path, max_words=MAX_HARVESTED_WORDS):
+    """
+    Collect likely password material from the file itself.
+
+    Words come from the filename first, then metadata values, then strings
+    found in the file body, in that order of likelihood.
+
+    Args:
+        file_path: Path to the file being analyzed
+        max_words: Maximum number of words to return
+
+    Returns:
+        List of unique words
+    """
+    words = []
+    seen = set()
+
+    def add(word):
+        if word and word not in seen and len(words) < max_words:
+            seen.add(word)
+            words.append(word)
+
+    # Filename: the whole stem and its parts
+    stem = Path(file_path).stem
+    add(stem)
+    for token in _TOKEN_RE.findall(stem):
+        add(token)
+
+    # Metadata values
+    try:
+        metadata = get_file_metadata(file_path)
+    except Exception:
+        metadata = {}
+    for field, value in metadata.items():
+        if field in SKIP_METADATA_FIELDS or field == "File Name" or field == "Error":
+            continue
+        value = str(value).strip()
+        if 3 <= len(value) <= 32 and ' ' not in value:
+            add(value)
+        for token in _TOKEN_RE.findall(value):
+            add(token)
+
+    # Strings from the file body; short or symbol-heavy runs are mostly noise
+    strings_words = 0
+    for line in extract_strings(file_path, min_length=6):
+        for token in _STRINGS_WORD_RE.findall(line):
+            if strings_words >= MAX_STRINGS_WORDS:
+                break
+            if token not in seen:
+                add(token)
+                strings_words += 1
+
+    return words
+
+def generate_passwords(base_words, max_candidates=None, dedup_capacity=100000):
+    """
+    Lazily generate password candidates from base words.
+
+    Rules are applied in tiers, cheapest and most probable first: the words
+    as given, case variants, common suffixes, leetspeak, year suffixes and
+    finally pairwise concatenations. Within a tier, earlier base words go
+    first. Candidates are deduplicated with a fixed-size Bloom filter.
+
+    Args:
+        base_words: Iterable of base words, most likely first
+        max_candidates: Stop after this many candidates (None = no limit)
+        dedup_capacity: Expected number of candidates for the dedup filter
+
+    Yields:
+        Password candidate strings
+    """
+    words = list(dict.fromkeys(base_words))
+    seen = BloomFilter(capacity=dedup_capacity)
+    produced = 0
+
+    for candidate in _candidate_tiers(words):
+        if seen.add(candidate):
+            continue
+        yield candidate
+        produced += 1
+        if max_candidates is not None and produced >= max_candidates:
+            return
+
+def password_candidates(file_path, extra_words=None, max_candidates=None):
+    """
+    Generate password candidates for a file.
+
+    Args:
+        file_path: Path to the file being analyzed
+        extra_words: Optional additional base words, tried after the defaults
+        max_candidates: Stop after this many candidates (None = no limit)
+
+    Yields:
+        Password candidate strings
+    """
+    def base_words():
+        yield from DEFAULT_PASSWORDS
+        yield from extra_words or []
+        yield from harvest_words(file_path)
+
+    yield from generate_passwords(base_words(), max_candidates=max_candidates)
+
+def _candidate_tiers(words):
+    """Yield mutated candidates tier by tier (duplicates included)."""
+    # Tier 0: words as given
+    yield from words
+
+    mutable = [word for word in words if word]
+
+    # Tier 1: case toggles
+    for word in mutable:
+        yield word.lower()
+        yield word.capitalize()
+        yield word.upper()
+        yield word[:1].swapcase() + word[1:]
+
+    # Tier 2: common suffixes
+    for suffix in COMMON_SUFFIXES:
+        for word in mutable:
+            yield word + suffix
+            yield word.capitalize() + suffix
+
+    # Tier 3: leetspeak
+    for word in mutable:
+        for table in LEET_TABLES:
+            yield word.lower().translate(table)
+
+    # Tier 4: year suffixes, recent years first
+    this_year = datetime.date.today().year
+    for year in range(this_year, this_year - YEAR_RANGE, -1):
+        for word in mutable:
+            yield f"{word}{year}"
+            yield f"{word}{year % 100:02d}"
+
+    # Tier 5: pairwise concatenations of the most likely words
+    head = mutable[:MAX_CONCAT_WORDS]
+    for first in head:
+        for second in head:
+            if first != second:
+                yield first + second
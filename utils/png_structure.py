@@ -0,0 +1,232 @@
+"""
+PNG chunk structure walker.
+Reads the chunk headers of a PNG and seeks over the image data, so even
+100 MB files are checked in milliseconds. Data appended after IEND,
+unknown or private chunks, oversized text chunks and CRC mismatches are
+reported as structured findings.
+"""
+
+import os
+import struct
+import zlib
+from utils.carving import identify_signature
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Chunk types defined by the PNG specification, its registered extensions
+# and APNG; anything else is reported
+KNOWN_CHUNKS = frozenset({
+    b'IHDR', b'PLTE', b'IDAT', b'IEND',
+    b'tRNS', b'cHRM', b'gAMA', b'iCCP', b'sBIT', b'sRGB', b'cICP', b'mDCV', b'cLLI',
+    b'tEXt', b'zTXt', b'iTXt', b'bKGD', b'hIST', b'pHYs', b'sPLT', b'eXIf', b'tIME',
+    b'acTL', b'fcTL', b'fdAT',
+    b'oFFs', b'pCAL', b'sCAL', b'sTER', b'gIFg', b'gIFx', b'gIFt', b'fRAc', b'dSIG',
+})
+
+# Chunks holding compressed image data; skipped by seeking unless their
+# CRCs are requested
+IMAGE_DATA_CHUNKS = frozenset({b'IDAT', b'fdAT'})
+
+TEXT_CHUNKS = frozenset({b'tEXt', b'zTXt', b'iTXt'})
+
+# Text chunks larger than this are reported; ordinary comments and
+# software tags are far smaller
+LARGE_TEXT_CHUNK = 1024
+
+# Keywords of text chunks that editors routinely fill with kilobytes of
+# metadata (XMP packets, ImageMagick's raw EXIF/IPTC/ICC profiles); these
+# are only reported above LARGE_ANCILLARY_CHUNK like other ancillary data
+STANDARD_TEXT_KEYWORDS = frozenset({"XML:com.adobe.xmp"})
+STANDARD_TEXT_KEYWORD_PREFIXES = ("Raw profile type ",)
+
+# Other ancillary chunks larger than this are reported (ICC profiles, the
+# usual large ones, rarely exceed it)
+LARGE_ANCILLARY_CHUNK = 256 * 1024
+
+# Chunk lengths above 2^31 - 1 are invalid
+MAX_CHUNK_LENGTH = 0x7FFFFFFF
+
+# Longest text chunk keyword (79 bytes) plus its terminator
+TEXT_KEYWORD_BYTES = 80
+
+# Bytes read per step when checking the CRC of a chunk
+CRC_BLOCK_SIZE = 1024 * 1024
+
+# Bytes of trailing data kept to identify what was appended
+TRAILING_HEAD_BYTES = 16
+
+# How strongly each kind of finding suggests hidden data (0-1)
+FINDING_SEVERITY = {
+    "trailing_data": 0.95,
+    "unknown_critical_chunk": 0.85,
+    "crc_mismatch": 0.7,
+    "invalid_chunk": 0.7,
+    "unknown_chunk": 0.6,
+    "large_text_chunk": 0.6,
+    "large_ancillary_chunk": 0.4,
+    "truncated": 0.3,
+}
+
+class PngStructure:
+    """Chunk layout of a PNG file and the anomalies found in it."""
+    def __init__(self, size):
+        self.size = size  # File size in bytes
+        self.chunks = []  # One dictionary per chunk, in file order
+        self.text_chunks = []  # Keyword and size of every text chunk
+        self.findings = []  # Anomalies, in file order
+        self.iend_end = None  # Offset just past the IEND chunk
+        self.trailing_bytes = 0  # Bytes after IEND
+
+    def add_finding(self, kind, offset, length, chunk=None, detail=""):
+        self.findings.append({
+            "kind": kind,
+            "offset": offset,
+            "length": length,
+            "chunk": chunk,
+            "detail": detail,
+            "severity": FINDING_SEVERITY[kind]
+        })
+
+    @property
+    def score(self):
+        """Severity of the most suspicious finding, 0 for a clean file."""
+        return max((finding["severity"] for finding in self.findings), default=0.0)
+
+    def to_dict(self):
+        """Convert structure to dictionary."""
+        return {
+            "size": self.size,
+            "chunk_count": len(self.chunks),
+            "text_chunks": self.text_chunks,
+            "findings": self.findings,
+            "iend_end": self.iend_end,
+            "trailing_bytes": self.trailing_bytes,
+            "score": self.score
+        }
+
+def is_png_file(path):
+    """Check the PNG signature without parsing further."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(8) == PNG_SIGNATURE
+    except OSError:
+        return False
+
+def _is_standard_keyword(keyword):
+    """Whether a text chunk keyword names a well-known metadata block."""
+    return keyword in STANDARD_TEXT_KEYWORDS or keyword.startswith(STANDARD_TEXT_KEYWORD_PREFIXES)
+
+def _read_chunk_body(f, chunk_type, length, check_crc, keep):
+    """
+    Consume a chunk's data and CRC.
+
+    Returns:
+        Tuple of (True/False if the CRC was checked, else None; the first
+        ``keep`` bytes of the data)
+    """
+    if not check_crc:
+        head = f.read(keep) if keep else b''
+        f.seek(length - len(head) + 4, 1)
+        return None, head
+
+    crc = zlib.crc32(chunk_type)
+    head = b''
+    remaining = length
+    while remaining:
+        block = f.read(min(remaining, CRC_BLOCK_SIZE))
+        if not block:
+            break
+        if len(head) < keep:
+            head += block[:keep - len(head)]
+        crc = zlib.crc32(block, crc)
+        remaining -= len(block)
+    stored = f.read(4)
+    return len(stored) == 4 and struct.unpack('>I', stored)[0] == crc, head
+
+def walk_png(file_path, verify_crc=True, verify_image_crc=False):
+    """
+    Walk the chunks of a PNG file.
+
+    Only chunk headers are read for image data; ancillary chunks are read
+    to check their CRC (and text chunk keywords), which is cheap because
+    they are small.
+
+    Args:
+        file_path: Path to the PNG file
+        verify_crc: Check the CRC of every non-image chunk
+        verify_image_crc: Also check IDAT/fdAT CRCs, which reads the whole file
+
+    Returns:
+        PngStructure object
+
+    Raises:
+        ValueError: If the file does not start with the PNG signature
+    """
+    structure = PngStructure(os.path.getsize(file_path))
+    size = structure.size
+
+    with open(file_path, 'rb') as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("Not a PNG file")
+        pos = 8
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                structure.add_finding("truncated", pos, size - pos, detail="File ends before IEND")
+                break
+
+            length, chunk_type = struct.unpack('>I4s', header)
+            name = chunk_type.decode('latin-1')
+            if length > MAX_CHUNK_LENGTH or not chunk_type.isalpha():
+                structure.add_finding("invalid_chunk", pos, size - pos, name,
+                                      f"Invalid chunk header {header.hex()}; rest of the file not parsed")
+                break
+            end = pos + 12 + length
+            if end > size:
+                structure.add_finding("truncated", pos, size - pos, name,
+                                      f"{name} chunk declares {length} bytes but the file ends first")
+                break
+
+            check = verify_crc and (verify_image_crc or chunk_type not in IMAGE_DATA_CHUNKS)
+            keep = TEXT_KEYWORD_BYTES if chunk_type in TEXT_CHUNKS else 0
+            crc_ok, head = _read_chunk_body(f, chunk_type, length, check, keep)
+            structure.chunks.append({"offset": pos, "type": name, "length": length, "crc_ok": crc_ok})
+
+            if crc_ok is False:
+                structure.add_finding("crc_mismatch", pos, length, name, f"{name} chunk CRC does not match its data")
+
+            ancillary = bool(chunk_type[0] & 0x20)
+            if chunk_type not in KNOWN_CHUNKS:
+                private = "private" if chunk_type[1] & 0x20 else "public"
+                if ancillary:
+                    structure.add_finding("unknown_chunk", pos, length, name,
+                                          f"Unknown {private} ancillary chunk {name} ({length} bytes)")
+                else:
+                    structure.add_finding("unknown_critical_chunk", pos, length, name,
+                                          f"Unknown {private} critical chunk {name} ({length} bytes)")
+            elif chunk_type in TEXT_CHUNKS:
+                keyword = head.split(b'\x00', 1)[0].decode('latin-1')
+                structure.text_chunks.append({"offset": pos, "type": name, "keyword": keyword, "size": length})
+                limit = LARGE_ANCILLARY_CHUNK if _is_standard_keyword(keyword) else LARGE_TEXT_CHUNK
+                if length > limit:
+                    structure.add_finding("large_text_chunk", pos, length, name,
+                                          f"{name} chunk '{keyword}' holds {length} bytes")
+            elif ancillary and length > LARGE_ANCILLARY_CHUNK:
+                structure.add_finding("large_ancillary_chunk", pos, length, name,
+                                      f"{name} chunk holds {length} bytes")
+
+            pos = end
+            if chunk_type == b'IEND':
+                structure.iend_end = pos
+                structure.trailing_bytes = size - pos
+                if pos < size:
+                    f.seek(pos)
+                    appended = identify_signature(f.read(TRAILING_HEAD_BYTES))
+                    detail = f"{size - pos} bytes after IEND"
+                    if appended:
+                        detail += f", starting with a {appended} signature"
+                    structure.add_finding("trailing_data", pos, size - pos, detail=detail)
+                break
+
+    return structure
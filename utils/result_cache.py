@@ -0,0 +1,219 @@
+"""
+Persistent cache for decoder outcomes.
+Results are keyed by the SHA-256 of the file contents plus the decoding
+method and its parameters, so re-uploads and reruns skip work already done.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache, partial
+from pathlib import Path
+
+# Bump when decoder output changes so stale entries are ignored
+CACHE_VERSION = 4
+
+# Default on-disk size limit before least recently used entries are evicted
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Number of entries kept in the in-process front layer
+DEFAULT_MEMORY_ENTRIES = 512
+
+# Environment variable overriding the cache location
+CACHE_DIR_ENV = "DEEPANAL_CACHE_DIR"
+
+@lru_cache(maxsize=64)
+def _file_sha256_cached(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(partial(f.read, 1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_sha256(path):
+    """SHA-256 of a file's contents, memoized on its modification time and size."""
+    stat = os.stat(path)
+    return _file_sha256_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+def default_cache_dir():
+    """Directory used by the default cache."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    return Path.home() / ".cache" / "deepanal" / "decoder"
+
+class DecoderCache:
+    """
+    Two-level cache of decoder outcomes.
+
+    Records (method, success, confidence, info) are JSON files on disk, with
+    payloads in a separate binary file that is only read when the payload is
+    accessed. An in-process LRU of records sits in front of the disk; it
+    never holds payloads, so cached results stay as light as lazy ones.
+    Payloads can be stored after their record, when they are first read.
+    When the disk layer grows past ``max_bytes``, the least recently used
+    entries are deleted. Disk errors are ignored, so a read-only home
+    directory only costs the persistence.
+    """
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._disk_bytes = None  # Computed on first write
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_hash, method, params):
+        """Build the cache key for a file hash, method name and parameter dict."""
+        material = json.dumps([CACHE_VERSION, file_hash, method, params], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached record.
+
+        Returns:
+            Record dict, or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        record_path = self.directory / f"{key}.json"
+        try:
+            with open(record_path, 'r') as f:
+                record = json.load(f)
+            os.utime(record_path)  # Mark as recently used
+        except (OSError, ValueError):
+            return None
+
+        self._remember(key, record)
+        return record
+
+    def put(self, key, record, data=None):
+        """
+        Store a record and optional payload bytes.
+
+        Args:
+            key: Key from make_key
+            record: JSON-serializable dict
+            data: Optional payload bytes; can also be stored later with
+                put_payload
+        """
+        self._remember(key, record)
+
+        if data is not None:
+            self.put_payload(key, data)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            encoded = json.dumps(record, default=str).encode('utf-8')
+            with open(self.directory / f"{key}.json", 'wb') as f:
+                f.write(encoded)
+        except OSError:
+            return
+        self._account(len(encoded))
+
+    def put_payload(self, key, data):
+        """Store the payload bytes of a record, written to disk only."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / f"{key}.bin", 'wb') as f:
+                f.write(data)
+        except OSError:
+            return
+        self._account(len(data))
+
+    def read_payload(self, key):
+        """Payload bytes of a record, read from disk, or None if none was stored."""
+        try:
+            with open(self.directory / f"{key}.bin", 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def clear(self):
+        """Remove every entry from both layers."""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = 0
+        for path in self._entries():
+            self._remove(path)
+
+    def _remember(self, key, record):
+        with self._lock:
+            self._memory[key] = record
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _account(self, written):
+        """Add bytes written to the disk layer's size and evict if it is over the limit."""
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_size()
+            else:
+                self._disk_bytes += written
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _entries(self):
+        try:
+            return list(self.directory.glob("*.json"))
+        except OSError:
+            return []
+
+    def _entry_size(self, record_path):
+        size = 0
+        for path in (record_path, record_path.with_suffix(".bin")):
+            try:
+                size += path.stat().st_size
+            except OSError:
+                pass
+        return size
+
+    def _scan_size(self):
+        return sum(self._entry_size(path) for path in self._entries())
+
+    def _remove(self, record_path):
+        for path in (record_path, record_path.with_suffix(".bin")):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Delete least recently used entries until the disk layer is at 90% of its limit."""
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        entries.sort()
+
+        total = sum(self._entry_size(path) for _, path in entries)
+        target = self.max_bytes * 0.9
+        for _, path in entries:
+            if total <= target:
+                break
+            size = self._entry_size(path)
+            self._remove(path)
+            total -= size
+            with self._lock:
+                self._memory.pop(path.stem, None)
+
+        with self._lock:
+            self._disk_bytes = total
+
+_default_cache = None
+
+def get_default_cache():
+    """Shared process-wide DecoderCache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DecoderCache()
+    return _default_cache
@@ -1,6 +1,6 @@
 """
 Steganography brute-force decoder utilities.
-Provides automated capabilities for detecting and extracting hidden data from images.
+Provides automated capabilities for detecting and extracting hidden data from images and audio.
 """
 
 import os
@@ -14,16 +14,64 @@ import numpy as np
 import base64
 from pathlib import Path
 import json
+import heapq
+import itertools
+import time
+import threading
+from functools import lru_cache, partial
+
+from utils.carving import CARVE_SIGNATURES, carve_artifacts
+from utils.passwords import password_candidates
+from utils.language import language_score
+from utils.traversal import GEOMETRIC_TRAVERSALS, pixel_order
+from utils.audio import is_wav_file, read_wav_info, pcm_low_bytes
+from utils.animation import is_animated, iter_frames
+from utils.result_cache import DecoderCache, file_sha256, get_default_cache
+from utils.tool_registry import tool_available, tool_path
+
+# Seconds before a single external tool invocation is killed
+EXTERNAL_TOOL_TIMEOUT = 30
+
+# Default per-method time budgets for brute_force_decode, in seconds
+# (None = unlimited)
+DEFAULT_METHOD_BUDGETS = {
+    "lsb": None,
+    "palette": None,
+    "metadata": EXTERNAL_TOOL_TIMEOUT,
+    "keyed_lsb": 30,
+    "steghide": 60,
+    "outguess": 60,
+}
 
 class DecoderResult:
-    """Container for storing decoder results."""
-    def __init__(self, method, data=None, success=False, confidence=0.0, info=None):
+    """
+    Container for storing decoder results.
+    
+    The payload can be given directly as ``data`` or as a ``loader`` callable
+    that produces it on first access, so results that are never looked at
+    never hold a copy of their payload.
+    """
+    def __init__(self, method, data=None, success=False, confidence=0.0, info=None, loader=None):
         self.method = method  # Decoding method used
-        self.data = data      # Extracted data (if any)
+        self._data = data      # Extracted data (if any)
+        self._loader = loader  # Produces the data lazily when it was not given
         self.success = success  # Whether decoding was successful
         self.confidence = confidence  # How confident are we in the result (0-1)
         self.info = info or {}  # Additional information about the result
     
+    @property
+    def data(self):
+        """Extracted data, materialized on first access."""
+        if self._data is None and self._loader is not None:
+            self._data = self._loader()
+            self._loader = None
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._loader = None
+    
     def to_dict(self):
         """Convert result to dictionary."""
         return {
@@ -38,8 +86,47 @@ class DecoderResult:
     def __repr__(self):
         return f"DecoderResult(method={self.method}, success={self.success}, confidence={self.confidence:.2f})"
 
+class _ResultCollector:
+    """Keeps the best results seen so far and drops the rest as they arrive."""
+    def __init__(self, top_k=None):
+        self.top_k = top_k
+        self._heap = []
+        self._count = 0
+    
+    def append(self, result):
+        # Earlier results win ties, matching a stable sort by confidence
+        entry = (result.confidence, -self._count, result)
+        self._count += 1
+        if self.top_k is None or len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        else:
+            heapq.heappushpop(self._heap, entry)
+    
+    def results(self):
+        """Return the kept results, most confident first."""
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+@lru_cache(maxsize=4)
+def _load_pixels_cached(image_path, mtime_ns, size):
+    img = Image.open(image_path)
+    if img.mode != 'RGB' and img.mode != 'RGBA':
+        img = img.convert('RGB')
+    pixels = np.array(img)
+    pixels.setflags(write=False)
+    return pixels
+
+def _load_pixels(image_path):
+    """
+    Load an image as a read-only RGB/RGBA array, shared between decoders.
+    
+    The cache is keyed on the file's modification time and size, so every
+    LSB variant run against the same image reuses one decoded copy.
+    """
+    stat = os.stat(image_path)
+    return _load_pixels_cached(str(image_path), stat.st_mtime_ns, stat.st_size)
+
 # LSB (Least Significant Bit) Decoders
-def decode_lsb(image_path, bit_plane=0, channel=0):
+def decode_lsb(image_path, bit_plane=0, channel=0, probe=True, traversal="row", key=None):
     """
     Extract data hidden using LSB steganography.
     
@@ -47,21 +134,20 @@ def decode_lsb(image_path, bit_plane=0, channel=0):
         image_path: Path to the image file
         bit_plane: Which bit plane to extract (0=least significant, 7=most significant)
         channel: Which color channel to use (0=R, 1=G, 2=B, 3=Alpha)
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+        traversal: Pixel visiting order (see utils.traversal.TRAVERSALS)
+        key: Password or seed for keyed traversals
     
     Returns:
         DecoderResult object
     """
     try:
-        # Open the image
-        img = Image.open(image_path)
-        if img.mode != 'RGB' and img.mode != 'RGBA':
-            img = img.convert('RGB')
-        
-        # Convert to numpy array for easier manipulation
-        pixels = np.array(img)
+        # Load the image as a shared numpy array
+        pixels = _load_pixels(image_path)
         
         # Extract the specified channel
-        max_channel = 2 if img.mode == 'RGB' else 3
+        max_channel = pixels.shape[2] - 1
         if channel > max_channel:
             channel = 0  # Default to red if invalid channel
         
@@ -69,49 +155,29 @@ def decode_lsb(image_path, bit_plane=0, channel=0):
         if bit_plane < 0 or bit_plane > 7:
             bit_plane = 0  # Default to LSB if invalid
         
-        # Extract bits from the image
-        extracted_bits = []
-        for row in pixels:
-            for pixel in row:
-                # Get the bit at specified position
-                if channel < len(pixel):
-                    bit = (pixel[channel] >> bit_plane) & 1
-                    extracted_bits.append(bit)
-        
-        # Convert bits to bytes
-        extracted_bytes = bytearray()
-        for i in range(0, len(extracted_bits) // 8):
-            byte = 0
-            for j in range(8):
-                if i*8 + j < len(extracted_bits):
-                    byte = (byte << 1) | extracted_bits[i*8 + j]
-            extracted_bytes.append(byte)
-        
-        # Check if the data looks like valid content
-        confidence = assess_data_validity(extracted_bytes)
-        
-        # Create DecoderResult
-        return DecoderResult(
-            method=f"LSB (Channel: {channel}, Bit: {bit_plane})",
-            data=bytes(extracted_bytes),
-            success=confidence > 0.3,
-            confidence=confidence,
+        samples = _channel_samples(pixels, channel)
+        order = pixel_order(pixels.shape, traversal, key)
+        
+        return _decode_bit_stream(
+            samples, _BitLayout((bit_plane,), order=order),
+            method=_traversal_label(f"LSB (Channel: {channel}, Bit: {bit_plane})", traversal),
             info={
                 "bit_plane": bit_plane,
                 "channel": channel,
-                "total_bits": len(extracted_bits)
-            }
+                "traversal": traversal
+            },
+            probe=probe
         )
         
     except Exception as e:
         return DecoderResult(
-            method=f"LSB (Channel: {channel}, Bit: {bit_plane})",
+            method=_traversal_label(f"LSB (Channel: {channel}, Bit: {bit_plane})", traversal),
             success=False,
             confidence=0.0,
             info={"error": str(e)}
         )
 
-def decode_multi_bit_lsb(image_path, bits=2, channel=0):
+def decode_multi_bit_lsb(image_path, bits=2, channel=0, probe=True, traversal="row", key=None):
     """
     Extract data using multi-bit LSB steganography.
     
@@ -119,6 +185,10 @@ def decode_multi_bit_lsb(image_path, bits=2, channel=0):
         image_path: Path to the image file
         bits: Number of least significant bits to use (1-4)
         channel: Which color channel to use (0=R, 1=G, 2=B)
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+        traversal: Pixel visiting order (see utils.traversal.TRAVERSALS)
+        key: Password or seed for keyed traversals
     
     Returns:
         DecoderResult object
@@ -128,69 +198,707 @@ def decode_multi_bit_lsb(image_path, bits=2, channel=0):
         if bits < 1 or bits > 4:
             bits = 2
         
-        # Open the image
+        # Load the image as a shared numpy array
+        pixels = _load_pixels(image_path)
+        
+        if channel >= pixels.shape[2]:
+            channel = 0
+        
+        samples = _channel_samples(pixels, channel)
+        order = pixel_order(pixels.shape, traversal, key)
+        
+        return _decode_bit_stream(
+            samples, _BitLayout(range(bits), order=order),
+            method=_traversal_label(f"Multi-bit LSB (Bits: {bits}, Channel: {channel})", traversal),
+            info={
+                "bits_used": bits,
+                "channel": channel,
+                "traversal": traversal
+            },
+            probe=probe
+        )
+        
+    except Exception as e:
+        return DecoderResult(
+            method=_traversal_label(f"Multi-bit LSB (Bits: {bits}, Channel: {channel})", traversal),
+            success=False,
+            confidence=0.0,
+            info={"error": str(e)}
+        )
+
+CHANNEL_NAMES = "RGBA"
+
+def decode_interleaved_lsb(image_path, channels="RGB", bits=1, bit_order="msb", probe=True,
+                           traversal="row", key=None):
+    """
+    Extract data whose bits are interleaved across several color channels.
+    
+    This is the layout most LSB tools use: for every pixel the low bits of
+    each channel are read in turn (R, G, B, ... in the given order), and the
+    resulting bit stream is packed into bytes.
+    
+    Args:
+        image_path: Path to the image file
+        channels: Channel order, as a string such as "RGB", "BGR" or "RGBA",
+            or a sequence of channel indices
+        bits: Number of low bits read from each channel (1-4), or a sequence
+            giving a count per channel. Within a channel the higher of these
+            bits is read first.
+        bit_order: "msb" to pack the first bit into the most significant bit
+            of each byte, "lsb" to pack it into the least significant bit
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+        traversal: Pixel visiting order (see utils.traversal.TRAVERSALS)
+        key: Password or seed for keyed traversals
+    
+    Returns:
+        DecoderResult object
+    """
+    if isinstance(channels, str):
+        channel_label = channels.upper()
+    else:
+        channel_label = "".join(CHANNEL_NAMES[c] for c in channels)
+    bit_label = bits if isinstance(bits, int) else ",".join(str(b) for b in bits)
+    method = _traversal_label(f"Interleaved LSB ({channel_label}, Bits: {bit_label}, {bit_order.upper()} First)", traversal)
+    
+    try:
+        pixels = _load_pixels(image_path)
+        
+        indices = [CHANNEL_NAMES.index(c) for c in channel_label]
+        if max(indices) >= pixels.shape[2]:
+            return DecoderResult(
+                method=method,
+                success=False,
+                confidence=0.0,
+                info={"error": f"Image has no {CHANNEL_NAMES[max(indices)]} channel"}
+            )
+        
+        counts = [bits] * len(indices) if isinstance(bits, int) else list(bits)
+        if len(counts) != len(indices) or min(counts) < 0 or max(counts) > 4 or max(counts) == 0:
+            raise ValueError(f"Invalid bit counts {bit_label} for channels {channel_label}")
+        
+        # All channels read the same bits unless their counts differ
+        positions = range(max(counts) - 1, -1, -1)
+        layout = _BitLayout(
+            positions,
+            channels=indices,
+            bit_counts=counts if len(set(counts)) > 1 else None,
+            bitorder='big' if bit_order == "msb" else 'little',
+            order=pixel_order(pixels.shape, traversal, key)
+        )
+        
+        return _decode_bit_stream(
+            pixels.reshape(-1, pixels.shape[2]), layout,
+            method=method,
+            info={
+                "channels": channel_label,
+                "bits_per_channel": counts,
+                "bit_order": bit_order,
+                "traversal": traversal
+            },
+            probe=probe
+        )
+        
+    except Exception as e:
+        return DecoderResult(
+            method=method,
+            success=False,
+            confidence=0.0,
+            info={"error": str(e)}
+        )
+
+def decode_animation_lsb(image_path, channels="RGB", bits=1, bit_order="msb", max_frames=None,
+                         skip_first=False, probe=True):
+    """
+    Extract interleaved LSB data from every frame of an animated image.
+    
+    Frames are decoded one at a time; a frame's pixels stay in memory only
+    while a successful result still refers to them.
+    
+    Args:
+        image_path: Path to the GIF or APNG file
+        channels: Channel order string ("RGB", "BGR", ...)
+        bits: Number of low bits read from each channel (1-4)
+        bit_order: "msb" or "lsb" first packing of bits into bytes
+        max_frames: Stop after this many frames (None = all)
+        skip_first: Skip frame 0, which the single-image decoders already see
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+    
+    Returns:
+        List of DecoderResult objects, one per frame
+    """
+    results = []
+    try:
+        for _, decode in _animation_frame_calls(image_path, channels, bits, bit_order,
+                                                max_frames, skip_first, probe):
+            results.append(decode())
+    except Exception as e:
+        results.append(DecoderResult(
+            method=f"Animation Interleaved LSB ({channels.upper()}, Bits: {bits}, {bit_order.upper()} First)",
+            success=False,
+            confidence=0.0,
+            info={"error": str(e)}
+        ))
+    
+    return results
+
+def _animation_frame_calls(image_path, channels="RGB", bits=1, bit_order="msb", max_frames=None,
+                           skip_first=False, probe=True):
+    """
+    Lazily yield one decoder call per animation frame.
+    
+    Frames are decoded as the iteration advances, so only the frame being
+    yielded is in memory.
+    
+    Yields:
+        Tuples of (frame index, decoder callable without arguments)
+    """
+    label = f"Interleaved LSB ({channels.upper()}, Bits: {bits}, {bit_order.upper()} First)"
+    layout = _BitLayout(
+        range(bits - 1, -1, -1),
+        channels=[CHANNEL_NAMES.index(c) for c in channels.upper()],
+        bitorder='big' if bit_order == "msb" else 'little'
+    )
+    
+    for index, pixels, _ in iter_frames(image_path, max_frames):
+        if skip_first and index == 0:
+            continue
+        yield index, partial(
+            _decode_bit_stream,
+            pixels.reshape(-1, pixels.shape[2]), layout,
+            method=f"Frame {index}: {label}",
+            info={
+                "frame": index,
+                "channels": channels.upper(),
+                "bits_per_channel": bits,
+                "bit_order": bit_order
+            },
+            probe=probe
+        )
+
+def decode_palette_lsb(image_path, sort_by_luminance=False, probe=True, traversal="row", key=None):
+    """
+    Extract data hidden in the palette indices of an indexed image.
+    
+    Reads the raw index plane instead of converting to RGB, which would
+    destroy the index LSBs. With ``sort_by_luminance`` each index is first
+    replaced by its rank in the palette ordered by brightness, the way
+    EzStego-style tools embed their bits.
+    
+    Args:
+        image_path: Path to the PNG or GIF image
+        sort_by_luminance: Read LSBs of luminance-sorted palette ranks
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+        traversal: Pixel visiting order (see utils.traversal.TRAVERSALS)
+        key: Password or seed for keyed traversals
+    
+    Returns:
+        DecoderResult object
+    """
+    method = _traversal_label(f"Palette LSB ({'Luminance Order' if sort_by_luminance else 'Index Order'})", traversal)
+    try:
         img = Image.open(image_path)
-        if img.mode != 'RGB' and img.mode != 'RGBA':
-            img = img.convert('RGB')
-        
-        # Convert to numpy array
-        pixels = np.array(img)
-        
-        # Extract data
-        extracted_bits = []
-        for row in pixels:
-            for pixel in row:
-                if channel < len(pixel):
-                    # Extract the specified number of bits
-                    for bit in range(bits):
-                        extracted_bits.append((pixel[channel] >> bit) & 1)
-        
-        # Convert bits to bytes
-        extracted_bytes = bytearray()
-        for i in range(0, len(extracted_bits) // 8):
-            byte = 0
-            for j in range(8):
-                if i*8 + j < len(extracted_bits):
-                    byte = (byte << 1) | extracted_bits[i*8 + j]
-            extracted_bytes.append(byte)
-        
-        # Assess confidence
-        confidence = assess_data_validity(extracted_bytes)
+        if img.mode != 'P':
+            return DecoderResult(
+                method=method,
+                success=False,
+                confidence=0.0,
+                info={"error": f"Image mode {img.mode} is not palette-based"}
+            )
+        
+        index_plane = np.asarray(img, dtype=np.uint8)
+        indices = index_plane.reshape(-1)
+        
+        if sort_by_luminance:
+            palette = np.array(img.getpalette(), dtype=np.float64).reshape(-1, 3)
+            luminance = palette @ np.array([0.299, 0.587, 0.114])
+            order = np.argsort(luminance, kind='stable')
+            rank = np.empty(len(order), dtype=np.uint8)
+            rank[order] = np.arange(len(order))
+            indices = rank[indices]
+        
+        return _decode_bit_stream(
+            indices, _BitLayout((0,), order=pixel_order(index_plane.shape, traversal, key)),
+            method=method,
+            info={
+                "palette_size": len(img.getpalette()) // 3,
+                "sort_by_luminance": sort_by_luminance,
+                "traversal": traversal
+            },
+            probe=probe
+        )
         
+    except Exception as e:
         return DecoderResult(
-            method=f"Multi-bit LSB (Bits: {bits}, Channel: {channel})",
-            data=bytes(extracted_bytes),
-            success=confidence > 0.3,
-            confidence=confidence,
+            method=method,
+            success=False,
+            confidence=0.0,
+            info={"error": str(e)}
+        )
+
+def decode_audio_lsb(audio_path, bits=1, channel=None, bit_order="msb", probe=True):
+    """
+    Extract data hidden in the sample LSBs of a PCM WAV file.
+    
+    Only the low byte of each sample is read, straight from a memory map of
+    the data chunk, so 8, 16 and 24-bit audio of any length is handled
+    without loading the recording.
+    
+    Args:
+        audio_path: Path to the WAV file
+        bits: Number of low bits read from each sample (1-4)
+        channel: Channel to read, or None to interleave all channels in
+            frame order (the usual layout of audio LSB tools)
+        bit_order: "msb" or "lsb" first packing of bits into bytes
+        probe: Only extract the stream header first and skip full extraction
+            when it does not look like it carries a payload
+    
+    Returns:
+        DecoderResult object
+    """
+    channel_label = "All" if channel is None else channel
+    method = f"Audio LSB (Channel: {channel_label}, Bits: {bits}, {bit_order.upper()} First)"
+    try:
+        if bits < 1 or bits > 4:
+            bits = 1
+        
+        wav = read_wav_info(audio_path)
+        low_bytes = pcm_low_bytes(wav)
+        positions = range(bits - 1, -1, -1)
+        bitorder = 'big' if bit_order == "msb" else 'little'
+        
+        if channel is None:
+            samples = low_bytes
+            layout = _BitLayout(positions, channels=range(wav.channels), bitorder=bitorder)
+        else:
+            if channel >= wav.channels:
+                channel = 0
+            samples = low_bytes[:, channel]
+            layout = _BitLayout(positions, bitorder=bitorder)
+        
+        return _decode_bit_stream(
+            samples, layout,
+            method=method,
             info={
+                "channel": channel,
                 "bits_used": bits,
-                "channel": channel
-            }
+                "bit_order": bit_order,
+                "audio": wav.to_dict()
+            },
+            probe=probe
         )
         
     except Exception as e:
         return DecoderResult(
-            method=f"Multi-bit LSB (Bits: {bits}, Channel: {channel})",
+            method=method,
             success=False,
             confidence=0.0,
             info={"error": str(e)}
         )
 
+def try_keyed_lsb_extract(image_path, passphrase="", timeout=None):
+    """
+    Try interleaved RGB LSB extraction along a password-keyed random walk.
+    
+    Args:
+        image_path: Path to the image file
+        passphrase: Password seeding the pixel permutation
+        timeout: Unused; accepted so the password loop can treat this like
+            the external tool wrappers
+    
+    Returns:
+        DecoderResult object
+    """
+    result = decode_interleaved_lsb(image_path, "RGB", 1, "msb", traversal="random", key=passphrase)
+    result.info["passphrase_used"] = passphrase
+    return result
+
+def _traversal_label(method, traversal):
+    """Append the traversal to a method name unless it is plain row order."""
+    if traversal == "row":
+        return method
+    return f"{method} [{traversal.replace('_', ' ').title()} Traversal]"
+
+def _channel_samples(pixels, channel):
+    """Flat view of one channel, in row-major pixel order, without copying."""
+    return pixels.reshape(-1, pixels.shape[2])[:, channel]
+
+class _BitLayout:
+    """
+    Which bits of each sample carry the stream, and how they form bytes.
+    
+    Samples are either a 1-D array (one value per pixel) or a 2-D
+    (pixels, channels) array. Per pixel, the ``channels`` are visited in the
+    given order, and per channel the bits at ``positions`` in the given
+    order. ``bit_counts`` optionally gives each channel its own number of
+    low bits; channels then read only their own bits of ``positions``.
+    Bits are packed into bytes MSB first (``bitorder='big'``) or LSB first
+    (``bitorder='little'``). ``order`` optionally gives the pixel traversal
+    as an index array (see utils.traversal).
+    """
+    def __init__(self, positions, channels=None, bit_counts=None, bitorder='big', order=None):
+        self.positions = np.asarray(positions, dtype=np.uint8)
+        self.channels = None if channels is None else np.asarray(channels, dtype=np.intp)
+        self.bitorder = bitorder
+        self.order = order
+        
+        # Boolean (channel, position) selection for uneven bit counts
+        self.mask = None
+        if bit_counts is not None:
+            counts = np.asarray(bit_counts, dtype=np.uint8)
+            self.mask = self.positions[None, :] < counts[:, None]
+        
+        if self.mask is not None:
+            self.bits_per_sample = int(self.mask.sum())
+        elif self.channels is not None:
+            self.bits_per_sample = len(self.channels) * len(self.positions)
+        else:
+            self.bits_per_sample = len(self.positions)
+
+def _extract_bits(samples, layout, max_bits=None, start=0):
+    """
+    Extract bits from sample values without a per-pixel Python loop.
+    
+    Args:
+        samples: 1-D array of sample values, or 2-D (pixels, channels) array
+        layout: _BitLayout describing which bits are read, in which order
+        max_bits: Optional limit; only the samples needed for it are touched
+        start: Index (in traversal order) of the first sample to read
+    
+    Returns:
+        1-D uint8 numpy array of bits
+    """
+    stop = None if max_bits is None else start + -(-max_bits // layout.bits_per_sample)
+    if layout.order is not None:
+        samples = samples[layout.order[start:stop]]
+    elif start or stop is not None:
+        samples = samples[start:stop]
+    
+    # Gather the channels after slicing, so only the needed pixels are copied
+    if layout.channels is not None:
+        samples = samples[:, layout.channels]
+    
+    bits = (samples[..., None] >> layout.positions) & 1
+    if layout.mask is not None:
+        bits = bits[:, layout.mask]
+    bits = bits.astype(np.uint8).reshape(-1)
+    
+    if max_bits is not None:
+        bits = bits[:max_bits]
+    return bits
+
+def _pack_bits(bits, bitorder='big'):
+    """Pack a bit array into bytes, dropping any trailing partial byte."""
+    usable = len(bits) - len(bits) % 8
+    return np.packbits(bits[:usable], bitorder=bitorder).tobytes()
+
+def _read_stream(samples, layout, max_bytes):
+    """
+    Extract and pack up to ``max_bytes`` of the stream.
+    
+    Long streams are processed in blocks of STREAM_CHUNK_BITS, so the
+    unpacked bits (one byte each) never exist for the whole stream at once.
+    """
+    max_bits = min(max_bytes * 8, len(samples) * layout.bits_per_sample)
+    if max_bits <= STREAM_CHUNK_BITS:
+        return _pack_bits(_extract_bits(samples, layout, max_bits), layout.bitorder)
+    
+    # Whole samples per block, and a multiple of 8 so every block packs
+    # into whole bytes
+    block_samples = max(1, STREAM_CHUNK_BITS // (8 * layout.bits_per_sample)) * 8
+    block_bits = block_samples * layout.bits_per_sample
+    parts = []
+    for start_bit in range(0, max_bits, block_bits):
+        bits = _extract_bits(samples, layout, min(block_bits, max_bits - start_bit),
+                             start=start_bit // layout.bits_per_sample)
+        parts.append(_pack_bits(bits, layout.bitorder))
+    return b''.join(parts)
+
+def _decode_bit_stream(samples, layout, method, info, probe=True):
+    """
+    Turn a sample array into a DecoderResult, probing the header first.
+    
+    Streams whose header is not a verified match get one more chance through
+    the XOR key search; if a key turns the header into a better match, the
+    full stream is extracted and decrypted with it.
+    
+    Args:
+        samples: Array of sample values carrying the stream
+        layout: _BitLayout describing which bits are read from each sample
+        method: Method name for the DecoderResult
+        info: Base info dictionary for the DecoderResult
+        probe: Whether to run the header probe before full extraction
+    
+    Returns:
+        DecoderResult object
+    """
+    info = dict(info)
+    capacity = len(samples) * layout.bits_per_sample // 8
+    limit = capacity
+    key = None
+    
+    if probe:
+        header = _read_stream(samples, layout, PROBE_BYTES)
+        verdict = probe_stream_header(header, capacity)
+        
+        if not verdict["verified"]:
+            window = _read_stream(samples, layout, XOR_WINDOW)
+            found = find_xor_key(window)
+            if found:
+                decrypted = probe_stream_header(xor_bytes(header, found[0]), capacity)
+                if decrypted["passed"] and (decrypted["verified"] or not verdict["passed"]):
+                    key, verdict = found[0], decrypted
+        
+        info["probe"] = verdict
+        
+        if not verdict["passed"]:
+            # Nothing in the header looks like a payload; skip full extraction
+            return DecoderResult(
+                method=method,
+                data=header,
+                success=False,
+                confidence=0.0,
+                info={**info, "total_bits": len(header) * 8, "truncated": True}
+            )
+        
+        if verdict["payload_length"] is not None:
+            limit = verdict["payload_offset"] + verdict["payload_length"]
+    
+    extracted = _read_stream(samples, layout, limit)
+    
+    if key is not None:
+        extracted = xor_bytes(extracted, key)
+    
+    if probe and info["probe"]["payload_length"] is not None:
+        extracted = extracted[info["probe"]["payload_offset"]:]
+    
+    # Check if the data looks like valid content
+    confidence = assess_data_validity(extracted)
+    info["total_bits"] = min(limit * 8, len(samples) * layout.bits_per_sample)
+    
+    payload_key = None
+    if key is None and confidence < 0.7:
+        # The payload itself may be XOR-obfuscated behind a plain header
+        found = find_xor_key(extracted[:XOR_WINDOW])
+        if found:
+            decrypted = xor_bytes(extracted, found[0])
+            decrypted_confidence = assess_data_validity(decrypted)
+            if decrypted_confidence > confidence:
+                payload_key, extracted, confidence = found[0], decrypted, decrypted_confidence
+    
+    if key is not None or payload_key is not None:
+        info["xor_key"] = (key or payload_key).hex()
+        method = f"{method} + XOR (Key: {info['xor_key']})"
+    
+    # Look for embedded files anywhere in the stream, not just at offset 0
+    artifacts = carve_artifacts(extracted)
+    if artifacts:
+        info["carved"] = [artifact.to_dict() for artifact in artifacts]
+        confidence = max(confidence, CARVED_CONFIDENCE)
+    
+    # Keep only the recipe for the payload; it is rebuilt from the shared
+    # samples if anyone reads the result's data
+    offset = info["probe"]["payload_offset"] if probe and info["probe"]["payload_length"] is not None else 0
+    return DecoderResult(
+        method=method,
+        success=confidence > 0.3,
+        confidence=confidence,
+        info=info,
+        loader=partial(_materialize_stream, samples, layout, limit, offset, key, payload_key)
+    )
+
+def _materialize_stream(samples, layout, limit, offset, key=None, payload_key=None):
+    """
+    Rebuild the payload described by a lazy DecoderResult.
+    
+    ``key`` is aligned with the start of the stream (it also covered the
+    header), ``payload_key`` with the start of the payload after ``offset``.
+    """
+    extracted = _read_stream(samples, layout, limit)
+    if key is not None:
+        extracted = xor_bytes(extracted, key)
+    extracted = extracted[offset:]
+    if payload_key is not None:
+        extracted = xor_bytes(extracted, payload_key)
+    return extracted
+
+# XOR Decoders
+def find_xor_key(window, max_key_length=None):
+    """
+    Search for an XOR key that turns a data window into plausible content.
+    
+    A key that turns the start of the window into a long file signature
+    (known plaintext) wins outright. Otherwise all 256 single-byte keys are
+    scored in one array operation, and repeating keys are recovered for the
+    most likely key lengths (estimated from the normalized Hamming distance
+    between consecutive blocks) by solving every key position against all
+    256 byte values at once.
+    
+    A short payload is followed by cover bits that score as noise, so the
+    search runs on growing prefixes of the window (XOR_PREFIX_WINDOWS) and
+    the best prefix that passes is taken. Each prefix only considers keys
+    that repeat at least XOR_MIN_KEY_REPEATS times in it.
+    
+    Args:
+        window: Bytes from the start of a candidate stream
+        max_key_length: Longest repeating key to consider
+    
+    Returns:
+        Tuple of (key bytes, score) for the best key, or None if no key
+        scores above XOR_MIN_SCORE
+    """
+    if max_key_length is None:
+        max_key_length = XOR_MAX_KEY_LENGTH
+    
+    data = np.frombuffer(bytes(window), dtype=np.uint8)
+    if len(data) < 16:
+        return None
+    
+    found = _signature_key(data)
+    if found:
+        return found
+    
+    best = None
+    lengths = sorted({length for length in XOR_PREFIX_WINDOWS if length < len(data)} | {len(data)})
+    for length in lengths:
+        found = _search_xor_key(data[:length], min(max_key_length, length // XOR_MIN_KEY_REPEATS))
+        # Ties go to the longer prefix, which carries more evidence
+        if found and (best is None or found[1] >= best[1]):
+            best = found
+    return best
+
+def _signature_key(data):
+    """Repeating key that turns the start of data into a long file signature, if any."""
+    for sig in _XOR_KNOWN_PLAINTEXTS:
+        if len(data) < len(sig):
+            continue
+        stream = data[:len(sig)] ^ sig
+        # The key must repeat within the signature for the match to be checked
+        for key_length in range(1, len(sig) - XOR_SIGNATURE_CHECK_BYTES + 1):
+            key = stream[:key_length]
+            if np.array_equal(stream, np.resize(key, len(sig))):
+                if not key.any():
+                    break  # The data is not encrypted
+                return key.tobytes(), 1.0
+    return None
+
+def _search_xor_key(data, max_key_length):
+    """Best single-byte or repeating key for one window, or None."""
+    if calculate_entropy(data.tobytes()) < XOR_MIN_ENTROPY:
+        return None
+    
+    # Single-byte keys: one (256, n) broadcast
+    candidates = data[None, :] ^ _ALL_KEYS[:, None]
+    scores = _score_plaintext(candidates)
+    best = int(np.argmax(scores))
+    found = [(bytes([best]), float(scores[best]))]
+    
+    # Repeating keys for the most promising lengths
+    for key_length in _estimate_key_lengths(data, max_key_length):
+        rows = len(data) // key_length
+        columns = data[:rows * key_length].reshape(rows, key_length).T
+        
+        # (256, key_length, rows): every key byte against every column
+        column_scores = _score_plaintext(columns[None, :, :] ^ _ALL_KEYS[:, None, None])
+        key = _minimal_period(np.argmax(column_scores, axis=0).astype(np.uint8))
+        
+        score = float(_score_plaintext(data ^ np.resize(key, len(data))))
+        found.append((key.tobytes(), score))
+    
+    # A repeated byte is never plaintext, whatever it decrypts to
+    found = [(key, score) for key, score in found
+             if _has_byte_diversity(data ^ np.resize(np.frombuffer(key, dtype=np.uint8), len(data)))]
+    if not found:
+        return None
+    
+    # Longer keys fit noise better, so prefer the shortest key that scores
+    # close to the best one
+    top_score = max(score for _, score in found)
+    best_key, best_score = min(
+        (item for item in found if item[1] >= top_score - 0.03),
+        key=lambda item: len(item[0])
+    )
+    
+    if best_score < XOR_MIN_SCORE or best_key == b'\x00':
+        return None
+    return best_key, best_score
+
+def xor_bytes(data, key):
+    """XOR data with a repeating key."""
+    if not data:
+        return b''
+    stream = np.frombuffer(bytes(data), dtype=np.uint8)
+    pad = np.resize(np.frombuffer(key, dtype=np.uint8), len(stream))
+    return (stream ^ pad).tobytes()
+
+def _minimal_period(key):
+    """Reduce a key that repeats a shorter key (e.g. b'abcabc') to that key."""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and np.array_equal(key, np.resize(key[:period], len(key))):
+            return key[:period]
+    return key
+
+def _estimate_key_lengths(data, max_key_length, count=3):
+    """Rank repeating-key lengths by normalized Hamming distance between blocks."""
+    lengths = []
+    distances = []
+    
+    for key_length in range(2, max_key_length + 1):
+        blocks = len(data) // key_length
+        if blocks < 4:
+            break
+        grid = data[:blocks * key_length].reshape(blocks, key_length)
+        differing = _POPCOUNT[grid[:-1] ^ grid[1:]]
+        lengths.append(key_length)
+        distances.append(differing.mean())
+    
+    order = np.argsort(distances)[:count]
+    return [lengths[i] for i in order]
+
+def _has_byte_diversity(data):
+    """Whether a uint8 array uses enough distinct values, none of them dominating."""
+    counts = np.bincount(data, minlength=256)
+    return np.count_nonzero(counts) >= MIN_DISTINCT_BYTES and counts.max() <= MAX_BYTE_SHARE * len(data)
+
+def _score_plaintext(candidates):
+    """
+    Score decrypted candidates along their last axis.
+    
+    Uses a per-byte weight table favouring letters and spaces, and gives a
+    full score to candidates that start with a known file signature.
+    """
+    scores = _PLAINTEXT_WEIGHTS[candidates].mean(axis=-1)
+    
+    if candidates.ndim == 2:
+        for sig in _XOR_SIGNATURES:
+            if candidates.shape[1] >= len(sig):
+                starts = np.all(candidates[:, :len(sig)] == sig, axis=1)
+                scores = np.where(starts, 1.0, scores)
+    
+    return scores
+
 # Metadata Decoders
-def extract_metadata_hidden_data(image_path):
+def extract_metadata_hidden_data(image_path, timeout=EXTERNAL_TOOL_TIMEOUT):
     """
     Extract data hidden in metadata fields.
     
     Args:
         image_path: Path to the image file
+        timeout: Seconds before exiftool is killed
     
     Returns:
         DecoderResult object
     """
+    exiftool = tool_path("exiftool")
+    if exiftool is None:
+        return _tool_missing("Metadata Extraction", "exiftool")
+    
     try:
         # Run exiftool to extract metadata
-        cmd = ["exiftool", "-j", image_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cmd = [exiftool, "-j", image_path]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         
         if result.returncode != 0:
             return DecoderResult(
@@ -278,25 +986,39 @@ def extract_metadata_hidden_data(image_path):
         )
 
 # External tool wrappers
-def try_steghide_extract(image_path, passphrase=""):
+def _tool_missing(method, tool):
+    """Failed result for a decoder whose tool is not installed; nothing is spawned."""
+    return DecoderResult(
+        method=method,
+        success=False,
+        confidence=0.0,
+        info={"error": f"{tool} not installed", "tool_missing": True}
+    )
+
+def try_steghide_extract(image_path, passphrase="", timeout=EXTERNAL_TOOL_TIMEOUT):
     """
     Attempt to extract data using steghide.
     
     Args:
         image_path: Path to the image file
         passphrase: Optional passphrase to try
+        timeout: Seconds before steghide is killed
     
     Returns:
         DecoderResult object
     """
+    steghide = tool_path("steghide")
+    if steghide is None:
+        return _tool_missing("Steghide", "steghide")
+    
     try:
         # Create a temporary file for output
         with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
             output_path = tmp_file.name
         
         # Run steghide to attempt extraction
-        cmd = ["steghide", "extract", "-sf", image_path, "-p", passphrase, "-xf", output_path, "-f"]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cmd = [steghide, "extract", "-sf", image_path, "-p", passphrase, "-xf", output_path, "-f"]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         
         if result.returncode != 0:
             if os.path.exists(output_path):
@@ -329,6 +1051,16 @@ def try_steghide_extract(image_path, passphrase=""):
             }
         )
         
+    except subprocess.TimeoutExpired:
+        # subprocess.run has already killed the process
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        return DecoderResult(
+            method="Steghide",
+            success=False,
+            confidence=0.0,
+            info={"error": f"Timed out after {timeout}s", "timed_out": True, "passphrase_used": bool(passphrase)}
+        )
     except Exception as e:
         if "output_path" in locals() and os.path.exists(output_path):
             os.unlink(output_path)
@@ -339,25 +1071,30 @@ def try_steghide_extract(image_path, passphrase=""):
             info={"error": str(e)}
         )
 
-def try_outguess_extract(image_path, passphrase=""):
+def try_outguess_extract(image_path, passphrase="", timeout=EXTERNAL_TOOL_TIMEOUT):
     """
     Attempt to extract data using outguess.
     
     Args:
         image_path: Path to the image file
         passphrase: Optional passphrase to try
+        timeout: Seconds before outguess is killed
     
     Returns:
         DecoderResult object
     """
+    outguess = tool_path("outguess")
+    if outguess is None:
+        return _tool_missing("Outguess", "outguess")
+    
     try:
         # Create a temporary file for output
         with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
             output_path = tmp_file.name
         
         # Run outguess to attempt extraction
-        cmd = ["outguess", "-r", "-k", passphrase, image_path, output_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        cmd = [outguess, "-r", "-k", passphrase, image_path, output_path]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         
         if result.returncode != 0:
             if os.path.exists(output_path):
@@ -390,6 +1127,16 @@ def try_outguess_extract(image_path, passphrase=""):
             }
         )
         
+    except subprocess.TimeoutExpired:
+        # subprocess.run has already killed the process
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        return DecoderResult(
+            method="Outguess",
+            success=False,
+            confidence=0.0,
+            info={"error": f"Timed out after {timeout}s", "timed_out": True, "passphrase_used": bool(passphrase)}
+        )
     except Exception as e:
         if "output_path" in locals() and os.path.exists(output_path):
             os.unlink(output_path)
@@ -401,10 +1148,216 @@ def try_outguess_extract(image_path, passphrase=""):
         )
 
 # Utility functions
+
+# Known file signatures and the confidence they lend to extracted data
+FILE_SIGNATURES = {
+    b'\x89PNG': 0.9,  # PNG
+    b'BM': 0.9,       # BMP
+    b'\xFF\xD8\xFF': 0.9,  # JPEG
+    b'GIF8': 0.9,     # GIF
+    b'PK': 0.8,       # ZIP/DOCX/etc
+    b'%PDF': 0.9,     # PDF
+    b'\x7FELF': 0.8,  # ELF binary
+    b'MZ': 0.8,       # Windows executable
+}
+
+# Signature lookup compiled once; longest signatures are tried first
+_SIGNATURE_RE = re.compile(b'|'.join(
+    re.escape(sig) for sig in sorted(FILE_SIGNATURES, key=len, reverse=True)
+))
+
+# Number of bytes from the start of a candidate that assess_data_validity scores
+SCORE_WINDOW = 4096
+
+_BASE64_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/='
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Number of generated passwords tried against steghide/outguess by default
+MAX_PASSWORD_CANDIDATES = 100
+
+# Bits unpacked at a time when extracting long streams
+STREAM_CHUNK_BITS = 8 * 1024 * 1024
+
+# brute_force_decode stops at the first result this confident, e.g. a
+# recognised file signature at offset 0
+EARLY_STOP_CONFIDENCE = 0.9
+
+# Expected seconds per call and prior probability that a call finds
+# something, per method family; used to run the most promising ones first
+METHOD_PRIORS = {
+    "interleaved_lsb": (0.005, 0.15),
+    "audio_lsb": (0.005, 0.15),
+    "lsb": (0.005, 0.10),
+    "palette": (0.005, 0.05),
+    "multi_bit_lsb": (0.005, 0.03),
+    "animation_lsb": (0.02, 0.05),
+    "metadata": (0.5, 0.05),
+    "keyed_lsb": (0.05, 0.01),
+    "steghide": (0.3, 0.03),
+    "outguess": (0.3, 0.01),
+}
+DEFAULT_METHOD_PRIOR = (0.1, 0.01)
+
+# Number of observations the priors are worth against measured calls
+PRIOR_WEIGHT = 20
+
+# Channel orders tried by brute_force_decode for interleaved LSB
+INTERLEAVED_ORDERS = ("RGB", "BGR")
+INTERLEAVED_ALPHA_ORDERS = ("RGBA", "ARGB")
+
+# Confidence given to a stream containing a structurally valid embedded file
+CARVED_CONFIDENCE = 0.75
+
+# Number of bytes from the start of a stream used to search for an XOR key
+XOR_WINDOW = 512
+
+# Longest repeating XOR key considered
+XOR_MAX_KEY_LENGTH = 32
+
+# Minimum plaintext score for a decrypted window to count as a hit
+XOR_MIN_SCORE = 0.8
+
+# Prefix lengths searched for a key, so a short payload followed by cover
+# noise is scored without the noise; the whole window is searched as well
+XOR_PREFIX_WINDOWS = (64, 96, 128, 192, 256)
+
+# Times a repeating key has to repeat within a prefix to be considered;
+# shorter columns can be fitted to letters by chance
+XOR_MIN_KEY_REPEATS = 8
+
+# Signature bytes that have to match beyond one key period when a key is
+# derived from a known file signature
+XOR_SIGNATURE_CHECK_BYTES = 4
+
+# Windows with less entropy than this (bits per byte) are not searched for a
+# key; a constant run such as 0xFF bits XORs into "zzzz..." under some key
+XOR_MIN_ENTROPY = 2.5
+
+# Fewest distinct byte values, and the largest share of the most common one,
+# that decrypted output needs to count as plaintext
+MIN_DISTINCT_BYTES = 8
+MAX_BYTE_SHARE = 0.5
+
+_ALL_KEYS = np.arange(256, dtype=np.uint8)
+_POPCOUNT = np.unpackbits(_ALL_KEYS[:, None], axis=1).sum(axis=1)
+
+# Letters and spaces score highest, other printable text a little less
+_PLAINTEXT_WEIGHTS = np.zeros(256)
+_PLAINTEXT_WEIGHTS[0x20:0x7f] = 0.6
+_PLAINTEXT_WEIGHTS[[0x09, 0x0a, 0x0d]] = 0.8
+_PLAINTEXT_WEIGHTS[list(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz ')] = 1.0
+
+# Signatures long enough not to match by chance under a wrong key
+_XOR_SIGNATURES = [
+    np.frombuffer(sig, dtype=np.uint8) for sig in FILE_SIGNATURES if len(sig) >= 3
+]
+
+# Full signatures long enough to recover a short repeating key from
+_XOR_KNOWN_PLAINTEXTS = [
+    np.frombuffer(sig, dtype=np.uint8) for sig, _, _ in CARVE_SIGNATURES
+    if len(sig) > XOR_SIGNATURE_CHECK_BYTES + 1
+]
+
+# Number of bytes extracted from a candidate stream before deciding on full extraction
+PROBE_BYTES = 256
+
+# Minimum run of printable ASCII in the header that counts as a text payload
+PROBE_MIN_PRINTABLE_RUN = 16
+
+_PRINTABLE_BYTES = bytes(range(0x20, 0x7f)) + b'\t\r\n'
+_PRINTABLE_RUN_RE = re.compile(rb'[\x20-\x7e\t\r\n]{%d,}' % PROBE_MIN_PRINTABLE_RUN)
+_LEADING_TEXT_RE = re.compile(rb'[\x20-\x7e\t\r\n]{64,}')
+
+def probe_stream_header(header, capacity):
+    """
+    Decide from the first bytes of a candidate stream whether it is worth
+    extracting in full.
+    
+    Looks for a 32-bit big/little endian length prefix that fits in the
+    stream, a known file signature (at offset 0 or after a length prefix) and
+    runs of printable text.
+    
+    Args:
+        header: First bytes of the candidate stream
+        capacity: Total number of bytes the stream can hold
+    
+    Returns:
+        Dictionary with ``passed``, ``verified`` (a signature or a length
+        prefix backed by its payload), ``reason``, ``payload_offset`` and
+        ``payload_length`` (None when the length is unknown)
+    """
+    verdict = {
+        "passed": False,
+        "verified": False,
+        "reason": None,
+        "payload_offset": 0,
+        "payload_length": None
+    }
+    
+    if len(header) < 4:
+        return verdict
+    
+    for sig in FILE_SIGNATURES:
+        if header.startswith(sig):
+            verdict.update(passed=True, verified=True, reason=f"signature {sig!r}")
+            return verdict
+    
+    # Length prefixes that fit in the stream, best supported first
+    prefixes = []
+    for byteorder in ("big", "little"):
+        length = int.from_bytes(header[:4], byteorder)
+        if 0 < length <= capacity - 4:
+            body = header[4:4 + length]
+            supported = (
+                any(body.startswith(sig) for sig in FILE_SIGNATURES) or
+                _printable_ratio(body) > 0.9
+            )
+            prefixes.append((supported, byteorder, length))
+    prefixes.sort(key=lambda p: not p[0])
+    
+    if prefixes and prefixes[0][0]:
+        _, byteorder, length = prefixes[0]
+        verdict.update(
+            passed=True,
+            verified=True,
+            reason=f"{byteorder}-endian length prefix",
+            payload_offset=4,
+            payload_length=length
+        )
+        return verdict
+    
+    if _PRINTABLE_RUN_RE.search(header):
+        verdict.update(passed=True, reason="printable run")
+        return verdict
+    
+    if prefixes:
+        # A bare length prefix is weak evidence, but extraction is bounded by it
+        _, byteorder, length = prefixes[0]
+        verdict.update(
+            passed=True,
+            reason=f"{byteorder}-endian length prefix (unverified)",
+            payload_offset=4,
+            payload_length=length
+        )
+    
+    return verdict
+
+def _printable_ratio(data):
+    """Fraction of bytes in data that are printable ASCII or common whitespace."""
+    if not data:
+        return 0.0
+    return 1 - len(data.translate(None, _PRINTABLE_BYTES)) / len(data)
+
 def assess_data_validity(data):
     """
     Assess how likely it is that the data contains meaningful content.
     
+    Only a bounded window from the start of the data is scored, so the cost
+    is the same for a 1 KB and a 100 MB candidate. Cheap byte-level features
+    (signature, printable ratio, base64 alphabet, entropy) are computed first;
+    the URL/email checks and the n-gram language score only run when the
+    window looks like text.
+    
     Args:
         data: Bytes object to analyze
     
@@ -414,146 +1367,416 @@ def assess_data_validity(data):
     if not data or len(data) < 4:
         return 0.0
     
-    confidence = 0.0
+    window = bytes(data[:SCORE_WINDOW])
     
     # Check for common file signatures
-    file_signatures = {
-        b'\x89PNG': 0.9,  # PNG
-        b'BM': 0.9,       # BMP
-        b'\xFF\xD8\xFF': 0.9,  # JPEG
-        b'GIF8': 0.9,     # GIF
-        b'PK': 0.8,       # ZIP/DOCX/etc
-        b'%PDF': 0.9,     # PDF
-        b'\x7FELF': 0.8,  # ELF binary
-        b'MZ': 0.8,       # Windows executable
-    }
+    match = _SIGNATURE_RE.match(window)
+    if match:
+        return FILE_SIGNATURES[match.group()]
     
-    for sig, conf in file_signatures.items():
-        if data.startswith(sig):
-            return conf
+    confidence = 0.0
+    printable_ratio = _printable_ratio(window)
     
-    # Check for plaintext
-    try:
-        text = data.decode('utf-8', errors='ignore')
-        printable_ratio = sum(c.isprintable() for c in text) / len(text)
-        
-        if printable_ratio > 0.9:
-            # Likely text
-            if any(marker in text.lower() for marker in ['http://', 'https://', '.com', '.org', '.net']):
-                confidence = max(confidence, 0.8)  # Contains URLs
-            
-            if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text):
-                confidence = max(confidence, 0.8)  # Contains emails
-            
-            word_pattern = r'\b[A-Za-z]{3,15}\b'
-            words = re.findall(word_pattern, text)
-            
-            if len(words) > 5:
-                # Probably contains actual text
-                confidence = max(confidence, 0.7)
-                
-                # Check for meaningful word transitions
-                meaningful_transitions = 0
-                for i in range(len(words) - 1):
-                    if len(words[i]) > 2 and len(words[i+1]) > 2:
-                        meaningful_transitions += 1
-                
-                if meaningful_transitions > 3:
-                    confidence = max(confidence, 0.85)
-    except:
-        pass
-    
-    # Check for base64
-    try:
-        base64.b64decode(data)
-        # If successful and data looks like base64
-        if re.match(r'^[A-Za-z0-9+/=]+$', data.decode('ascii', errors='ignore')):
-            confidence = max(confidence, 0.6)
-    except:
-        pass
+    # Check for plaintext, either filling the window or leading it (a message
+    # followed by the remaining cover bits)
+    if printable_ratio > 0.9:
+        confidence = max(confidence, _score_text(window))
+    else:
+        leading = _LEADING_TEXT_RE.match(window)
+        if leading:
+            confidence = max(confidence, _score_text(leading.group()))
+    
+    # Check for base64 (a run of one letter is in the alphabet too)
+    if (not window.translate(None, _BASE64_BYTES) and (len(data) > SCORE_WINDOW or len(window) % 4 == 0)
+            and _has_byte_diversity(np.frombuffer(window, dtype=np.uint8))):
+        confidence = max(confidence, 0.6)
     
     # Check entropy
-    entropy = calculate_entropy(data)
+    entropy = calculate_entropy(window)
     if 4.0 < entropy < 5.5:
         # Likely compressed/encrypted data
         confidence = max(confidence, 0.5)
     
     return confidence
 
+def _score_text(data):
+    """Score printable text for URLs, emails and how much it reads like language."""
+    text = data.decode('ascii', errors='ignore')
+    confidence = 0.0
+    lowered = text.lower()
+    
+    if any(marker in lowered for marker in ['http://', 'https://', '.com', '.org', '.net']):
+        confidence = max(confidence, 0.8)  # Contains URLs
+    
+    if _EMAIL_RE.search(text):
+        confidence = max(confidence, 0.8)  # Contains emails
+    
+    # Natural language outranks printable noise without per-word regexes
+    confidence = max(confidence, 0.85 * language_score(data))
+    
+    return confidence
+
 def calculate_entropy(data):
     """Calculate Shannon entropy of data."""
     if not data:
         return 0.0
     
-    entropy = 0
-    for x in range(256):
-        p_x = data.count(x)/len(data)
-        if p_x > 0:
-            entropy += -p_x * np.log2(p_x)
-    return entropy
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    probabilities = counts[counts > 0] / len(data)
+    return float(-np.sum(probabilities * np.log2(probabilities)))
 
-# Brute Force Decoders
-def brute_force_decode(image_path, password_list=None):
+# Scheduling
+class CancellationToken:
+    """Flag that lets another thread (e.g. the UI) stop a running brute force."""
+    def __init__(self):
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """Request cancellation; the run stops before its next candidate."""
+        self._event.set()
+    
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+class _Scheduler:
     """
-    Attempt to decode steganographic content using multiple methods.
+    Tracks the global and per-method time budgets of one brute-force run.
+    
+    A method's clock starts when its first candidate starts. Before every
+    candidate the run checks ``should_run``; external tools get the remaining
+    budget as their subprocess timeout, so they are killed on expiry.
+    """
+    def __init__(self, time_budget=None, method_budgets=None, cancel_token=None):
+        now = time.monotonic()
+        self.deadline = now + time_budget if time_budget is not None else None
+        self.method_budgets = {**DEFAULT_METHOD_BUDGETS, **(method_budgets or {})}
+        self.cancel_token = cancel_token
+        self._method_deadlines = {}
+    
+    def remaining(self, method):
+        """Seconds left for a method (None if unlimited)."""
+        now = time.monotonic()
+        if method not in self._method_deadlines:
+            budget = self.method_budgets.get(method)
+            self._method_deadlines[method] = now + budget if budget is not None else None
+        
+        deadlines = [d for d in (self.deadline, self._method_deadlines[method]) if d is not None]
+        if not deadlines:
+            return None
+        return min(deadlines) - now
+    
+    def should_run(self, method):
+        """Whether another candidate of this method may start."""
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            return False
+        remaining = self.remaining(method)
+        return remaining is None or remaining > 0
+    
+    def timeout(self, method):
+        """Subprocess timeout for the next external tool invocation."""
+        remaining = self.remaining(method)
+        if remaining is None:
+            return EXTERNAL_TOOL_TIMEOUT
+        return max(0.1, min(remaining, EXTERNAL_TOOL_TIMEOUT))
+
+class _MethodStatistics:
+    """
+    Running estimate of each method family's cost and hit rate.
+    
+    Starts from METHOD_PRIORS, which count as PRIOR_WEIGHT observations, and
+    is updated with every decoder call made in this process.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # method -> [attempts, hits, seconds]
+    
+    def record(self, method, seconds, success):
+        with self._lock:
+            calls = self._calls.setdefault(method, [0, 0, 0.0])
+            calls[0] += 1
+            calls[1] += bool(success)
+            calls[2] += seconds
+    
+    def priority(self, method):
+        """Expected hits per second of work for a method family."""
+        prior_cost, prior_hit_rate = METHOD_PRIORS.get(method, DEFAULT_METHOD_PRIOR)
+        with self._lock:
+            attempts, hits, seconds = self._calls.get(method, (0, 0, 0.0))
+        hit_rate = (prior_hit_rate * PRIOR_WEIGHT + hits) / (PRIOR_WEIGHT + attempts)
+        cost = (prior_cost * PRIOR_WEIGHT + seconds) / (PRIOR_WEIGHT + attempts)
+        return hit_rate / max(cost, 1e-6)
+
+_method_stats = _MethodStatistics()
+
+def _password_calls(extract, image_path, passwords, timeout):
+    """Yield (params, decoder) calls of a password-based extractor."""
+    for password in passwords:
+        yield {"passphrase": password}, partial(_call_extractor, extract, image_path, password, timeout)
+
+def _call_extractor(extract, image_path, password, timeout):
+    # The timeout is read when the call starts, from the remaining budget
+    return extract(image_path, password, timeout=timeout())
+
+# Result caching
+def _cached_payload(cache, key, decode):
+    """Payload of a cached success, re-running the decoder if it was never stored."""
+    data = cache.read_payload(key)
+    if data is None:
+        data = decode().data
+        if data is not None:
+            cache.put_payload(key, data)
+    return data
+
+def _stored_payload(cache, key, loader):
+    """Materialize a lazy payload and store it with its cached record."""
+    data = loader()
+    if data is not None:
+        cache.put_payload(key, data)
+    return data
+
+def _run_cached(cache, file_hash, method, params, decode):
+    """
+    Return the cached outcome of a decoder call, or run it and cache it.
+    
+    Failed attempts are cached as well (without payload), so e.g. a wrong
+    passphrase is never retried on the same file. Timeouts and errors are
+    not cached, since a later run may succeed.
+    
+    Only the record is cached up front; a lazy payload is written to the
+    cache when it is first read, and a cached one is read back from disk on
+    demand, so caching never materializes or pins a payload.
     
     Args:
-        image_path: Path to the image file
-        password_list: Optional list of passwords to try
+        cache: DecoderCache, or None to always run the decoder
+        file_hash: SHA-256 of the file being decoded
+        method: Method family name (e.g. "lsb", "steghide")
+        params: Dictionary of parameters identifying the call
+        decode: Zero-argument callable running the decoder
     
     Returns:
-        List of DecoderResult objects
+        DecoderResult object
     """
-    results = []
+    if cache is None:
+        return decode()
     
-    # Set default password list if none provided
-    if not password_list:
-        password_list = ["", "password", "123456", "admin", "stego", "secret", "hidden"]
+    key = cache.make_key(file_hash, method, params)
+    record = cache.get(key)
+    if record:
+        return DecoderResult(
+            method=record["method"],
+            success=record["success"],
+            confidence=record["confidence"],
+            info=dict(record["info"], cached=True),
+            loader=partial(_cached_payload, cache, key, decode) if record["success"] else None
+        )
+    
+    result = decode()
+    if not result.info.get("timed_out") and ("error" not in result.info or "passphrase_used" in result.info):
+        # Payloads already in memory are stored now; lazy ones once they are read
+        eager = result.success and result._data is not None
+        cache.put(key, {
+            "method": result.method,
+            "success": result.success,
+            "confidence": result.confidence,
+            "info": result.info
+        }, result._data if eager else None)
+        if result.success and result._loader is not None:
+            result._loader = partial(_stored_payload, cache, key, result._loader)
+    return result
+
+# Brute Force Decoders
+def _unreadable_input(method, error):
+    """Failed result for a decoder family whose input could not be read."""
+    return DecoderResult(
+        method=method,
+        success=False,
+        confidence=0.0,
+        info={"error": str(error)}
+    )
+
+def _lsb_candidates(file_path):
+    """
+    Yield the LSB-style decoder calls worth trying on a file.
+    
+    Yields:
+        Tuples of (budget name, cache method name, parameter dict, decoder
+        callable without arguments)
+    """
+    if is_wav_file(file_path):
+        try:
+            channels = read_wav_info(file_path).channels
+        except (OSError, ValueError):
+            return  # Float, 32-bit or malformed WAV: no sample LSBs to read
+        
+        # Audio: sample LSBs interleaved across channels, then per channel
+        for bits in (1, 2):
+            for bit_order in ("msb", "lsb"):
+                yield ("lsb", "audio_lsb", {"bits": bits, "bit_order": bit_order},
+                       partial(decode_audio_lsb, file_path, bits=bits, bit_order=bit_order))
+        if channels > 1:
+            for channel in range(channels):
+                yield ("lsb", "audio_lsb", {"bits": 1, "bit_order": "msb", "channel": channel},
+                       partial(decode_audio_lsb, file_path, bits=1, channel=channel))
+        return
     
     # Try LSB decoding with different parameters
     for channel in range(3):  # R, G, B channels
         for bit_plane in [0, 1]:  # Focus on lower bit planes
-            results.append(decode_lsb(image_path, bit_plane, channel))
+            yield ("lsb", "lsb", {"channel": channel, "bit_plane": bit_plane},
+                   partial(decode_lsb, file_path, bit_plane, channel))
     
     # Try multi-bit LSB
     for channel in range(3):
-        results.append(decode_multi_bit_lsb(image_path, bits=2, channel=channel))
+        yield ("lsb", "multi_bit_lsb", {"channel": channel, "bits": 2},
+               partial(decode_multi_bit_lsb, file_path, bits=2, channel=channel))
     
-    # Try metadata extraction
-    results.append(extract_metadata_hidden_data(image_path))
+    # Try channel-interleaved LSB, the layout most embedding tools use. The
+    # header probe rejects most of these after reading a few hundred bytes.
+    try:
+        has_alpha = _load_pixels(file_path).shape[2] == 4
+    except (OSError, ValueError) as e:
+        # Not an image, or a truncated one: the remaining decoders need the pixels too
+        yield ("lsb", "interleaved_lsb", {}, partial(_unreadable_input, "Interleaved LSB", e))
+        return
+    channel_orders = INTERLEAVED_ORDERS + (INTERLEAVED_ALPHA_ORDERS if has_alpha else ())
+    for channels in channel_orders:
+        for bits in (1, 2):
+            for bit_order in ("msb", "lsb"):
+                yield ("lsb", "interleaved_lsb", {"channels": channels, "bits": bits, "bit_order": bit_order},
+                       partial(decode_interleaved_lsb, file_path, channels, bits, bit_order))
     
-    # Try external tools with different passwords
-    for password in password_list:
-        try:
-            # Steghide
-            steghide_result = try_steghide_extract(image_path, password)
-            if steghide_result.success:
-                results.append(steghide_result)
-                # If successful, no need to try more passwords
-                break
-            
-            # Only add failed result if it's the empty password
-            if password == "":
-                results.append(steghide_result)
-        except:
-            pass
+    # Try the other geometric pixel orders for the most common layout
+    for traversal in GEOMETRIC_TRAVERSALS:
+        if traversal != "row":
+            yield ("lsb", "interleaved_lsb",
+                   {"channels": "RGB", "bits": 1, "bit_order": "msb", "traversal": traversal},
+                   partial(decode_interleaved_lsb, file_path, "RGB", 1, "msb", traversal=traversal))
     
-    for password in password_list:
-        try:
-            # Outguess
-            outguess_result = try_outguess_extract(image_path, password)
-            if outguess_result.success:
-                results.append(outguess_result)
-                # If successful, no need to try more passwords
+    # Indexed images also carry data in the palette index LSBs
+    try:
+        with Image.open(file_path) as img:
+            is_palette = img.mode == 'P'
+    except (OSError, ValueError) as e:
+        yield ("palette", "palette", {}, partial(_unreadable_input, "Palette LSB", e))
+        return
+    if is_palette:
+        for sort_by_luminance in (False, True):
+            yield ("palette", "palette", {"sort_by_luminance": sort_by_luminance},
+                   partial(decode_palette_lsb, file_path, sort_by_luminance))
+
+def brute_force_decode(image_path, password_list=None, top_k=None,
+                       time_budget=None, method_budgets=None, cancel_token=None,
+                       cache=True, stop_confidence=EARLY_STOP_CONFIDENCE, exhaustive=False,
+                       on_result=None):
+    """
+    Attempt to decode steganographic content using multiple methods.
+    
+    Method families run in order of expected payoff (hit rate per second,
+    learned as the process runs), so cheap in-process decoders come before
+    subprocess-based password searches. Unless ``exhaustive`` is set, the
+    run stops as soon as one result reaches ``stop_confidence``.
+    
+    The run also stops early when the global ``time_budget`` expires or
+    ``cancel_token`` is cancelled, and a method stops once its own budget is
+    used up; whatever was collected until then is returned.
+    
+    Args:
+        image_path: Path to the image or WAV file
+        password_list: Optional list of passwords to try
+        top_k: Only keep the ``top_k`` most confident results; the others are
+            dropped as they arrive and never materialize their payload
+        time_budget: Optional overall limit in seconds
+        method_budgets: Optional per-method limits in seconds, overriding
+            DEFAULT_METHOD_BUDGETS (keys: lsb, palette, metadata, keyed_lsb,
+            steghide, outguess)
+        cancel_token: Optional CancellationToken checked between candidates
+        cache: True for the shared on-disk result cache, a DecoderCache to
+            use a specific one, or False to disable caching
+        stop_confidence: Stop at the first result with at least this
+            confidence (None = never stop early)
+        exhaustive: Run every method regardless of ``stop_confidence``
+        on_result: Optional callable invoked with each successful result as
+            soon as it is found
+    
+    Returns:
+        List of DecoderResult objects, most confident first
+    """
+    results = _ResultCollector(top_k)
+    scheduler = _Scheduler(time_budget, method_budgets, cancel_token)
+    if exhaustive:
+        stop_confidence = None
+    
+    if cache is True:
+        cache = get_default_cache()
+    elif not isinstance(cache, DecoderCache):
+        cache = None
+    file_hash = file_sha256(image_path) if cache is not None else None
+    run = partial(_run_cached, cache, file_hash)
+    
+    # Generate passwords from common defaults and the file itself if none provided
+    if not password_list:
+        password_list = password_candidates(image_path, max_candidates=MAX_PASSWORD_CANDIDATES)
+    
+    # Every method family is a lazy sequence of (params, decoder) calls
+    families = {}
+    
+    # LSB-style decoders that apply to this kind of file
+    for budget, method, params, decode in _lsb_candidates(image_path):
+        families.setdefault(method, (budget, []))[1].append((params, decode))
+    
+    # The LSB decoders only see the first frame of an animation
+    if is_animated(image_path):
+        families["animation_lsb"] = ("lsb", (
+            ({"frame": index, "channels": "RGB", "bits": 1, "bit_order": "msb"}, decode)
+            for index, decode in _animation_frame_calls(image_path, skip_first=True)
+        ))
+    
+    # Families backed by a tool that is not installed are skipped outright
+    if tool_available("exiftool"):
+        families["metadata"] = ("metadata", [
+            ({}, lambda: extract_metadata_hidden_data(image_path, timeout=scheduler.timeout("metadata")))
+        ])
+    
+    # Password-based methods share one (possibly lazy) candidate stream
+    if is_wav_file(image_path):
+        # outguess and keyed pixel walks only apply to images
+        extractors = {"steghide": try_steghide_extract}
+    else:
+        extractors = {
+            "keyed_lsb": try_keyed_lsb_extract,
+            "steghide": try_steghide_extract,
+            "outguess": try_outguess_extract
+        }
+    extractors = {name: extract for name, extract in extractors.items()
+                  if name not in ("steghide", "outguess") or tool_available(name)}
+    for (name, extract), passwords in zip(extractors.items(), itertools.tee(password_list, len(extractors))):
+        families[name] = (name, _password_calls(extract, image_path, passwords, partial(scheduler.timeout, name)))
+    
+    # Most promising families first: prior hit rate per second of work
+    for method in sorted(families, key=_method_stats.priority, reverse=True):
+        budget, calls = families[method]
+        for params, decode in calls:
+            if not scheduler.should_run(budget):
                 break
             
-            # Only add failed result if it's the empty password
-            if password == "":
-                results.append(outguess_result)
-        except:
-            pass
-    
-    # Sort by confidence
-    results.sort(key=lambda x: x.confidence, reverse=True)
+            started = time.monotonic()
+            result = run(method, params, decode)
+            if not result.info.get("cached"):
+                _method_stats.record(method, time.monotonic() - started, result.success)
+            
+            # Only add a failed password attempt if it's the empty password
+            if method in extractors and not result.success and params["passphrase"] != "":
+                continue
+            results.append(result)
+            
+            if result.success and on_result is not None:
+                on_result(result)
+            if stop_confidence is not None and result.confidence >= stop_confidence:
+                return results.results()
+            
+            # If a password worked, no need to try more passwords
+            if method in extractors and result.success:
+                break
     
-    return results
\ No newline at end of file
+    return results.results()
\ No newline at end of file
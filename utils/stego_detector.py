@@ -5,14 +5,24 @@ Provides functionality to analyze images and determine the likelihood of hidden
 
 import numpy as np
 from PIL import Image
-import subprocess
-import tempfile
 import os
 import re
 import struct
 from scipy import stats
 import random
 
+from utils.audio import read_wav_info, iter_pcm_samples
+from utils.animation import is_animated, iter_frames, low_bit_changes
+from utils.tool_registry import tool_path
+from utils.tool_runner import get_tool_runner
+from utils.png_structure import is_png_file, walk_png
+from utils.jpeg_structure import is_jpeg_file, walk_jpeg
+
+# A frame counts as changed only in its low bits when at least this many
+# pixels changed and this share of them changed in the LSB plane alone
+MIN_LOW_BIT_CHANGES = 64
+LOW_BIT_ONLY_RATIO = 0.9
+
 class DetectionResult:
     """Container for detection results."""
     def __init__(self):
@@ -55,18 +65,23 @@ class DetectionResult:
         else:
             return "#ff0000"  # Red - high likelihood
     
-    def generate_explanation(self):
-        """Generate a human-readable explanation of the results."""
+    def generate_explanation(self, medium="image"):
+        """
+        Generate a human-readable explanation of the results.
+        
+        Args:
+            medium: What was analyzed, as named in the text ("image" or "audio")
+        """
         if self.likelihood < 0.1:
-            main_finding = "No significant indicators of steganography detected. The image appears normal."
+            main_finding = f"No significant indicators of steganography detected. The {medium} appears normal."
         elif self.likelihood < 0.3:
-            main_finding = "Some minor irregularities detected, but they could be due to normal image processing."
+            main_finding = f"Some minor irregularities detected, but they could be due to normal {medium} processing."
         elif self.likelihood < 0.6:
-            main_finding = "Several indicators suggest possible hidden data. The image shows patterns that may be consistent with steganographic techniques."
+            main_finding = f"Several indicators suggest possible hidden data. The {medium} shows patterns that may be consistent with steganographic techniques."
         elif self.likelihood < 0.8:
             main_finding = "High likelihood of hidden data detected. Multiple indicators suggest steganographic content."
         else:
-            main_finding = "Very strong evidence of hidden data. The image exhibits clear signs of steganographic manipulation."
+            main_finding = f"Very strong evidence of hidden data. The {medium} exhibits clear signs of steganographic manipulation."
         
         # Add details about the specific indicators
         indicator_details = []
@@ -94,6 +109,10 @@ def analyze_image_for_steganography(image_path):
     """
     result = DetectionResult()
     
+    # Animations are analyzed frame by frame
+    if is_animated(image_path):
+        return analyze_animation_for_steganography(image_path)
+    
     # Open the image
     try:
         img = Image.open(image_path)
@@ -104,35 +123,13 @@ def analyze_image_for_steganography(image_path):
         pixels = np.array(img)
         
         # Run various detection methods
+        add_pixel_indicators(result, pixels)
+        add_structure_indicators(result, image_path)
         
-        # 1. Statistical analysis of LSB
-        lsb_likelihood = detect_lsb_steganography(pixels)
-        result.add_indicator("LSB Analysis", lsb_likelihood, weight=1.5)
-        
-        # 2. Histogram analysis
-        histogram_likelihood = analyze_histogram(pixels)
-        result.add_indicator("Histogram Analysis", histogram_likelihood, weight=1.2)
-        
-        # 3. Noise analysis
-        noise_likelihood = analyze_noise_patterns(pixels)
-        result.add_indicator("Noise Analysis", noise_likelihood, weight=1.0)
-        
-        # 4. Chi-square analysis
-        chi_square_likelihood = chi_square_test(pixels)
-        result.add_indicator("Chi-Square Test", chi_square_likelihood, weight=1.3)
-        
-        # 5. Metadata analysis
+        # Metadata analysis
         metadata_likelihood = analyze_metadata(image_path)
         result.add_indicator("Metadata Analysis", metadata_likelihood, weight=0.8)
         
-        # 6. Sample pair analysis
-        sample_pair_likelihood = sample_pair_analysis(pixels)
-        result.add_indicator("Sample Pair Analysis", sample_pair_likelihood, weight=1.1)
-        
-        # 7. RGB correlation
-        rgb_correlation_likelihood = analyze_rgb_correlation(pixels)
-        result.add_indicator("RGB Correlation", rgb_correlation_likelihood, weight=1.0)
-        
         # Calculate overall likelihood
         result.calculate_overall_likelihood()
         
@@ -148,6 +145,287 @@ def analyze_image_for_steganography(image_path):
     
     return result
 
+def add_pixel_indicators(result, pixels):
+    """
+    Run the pixel-based detection methods and add them to a result.
+    
+    Args:
+        result: DetectionResult to add the indicators to
+        pixels: Numpy array of pixel values
+    """
+    # 1. Statistical analysis of LSB
+    lsb_likelihood = detect_lsb_steganography(pixels)
+    result.add_indicator("LSB Analysis", lsb_likelihood, weight=1.5)
+    
+    # 2. Histogram analysis
+    histogram_likelihood = analyze_histogram(pixels)
+    result.add_indicator("Histogram Analysis", histogram_likelihood, weight=1.2)
+    
+    # 3. Noise analysis
+    noise_likelihood = analyze_noise_patterns(pixels)
+    result.add_indicator("Noise Analysis", noise_likelihood, weight=1.0)
+    
+    # 4. Chi-square analysis
+    chi_square_likelihood = chi_square_test(pixels)
+    result.add_indicator("Chi-Square Test", chi_square_likelihood, weight=1.3)
+    
+    # 5. Sample pair analysis
+    sample_pair_likelihood = sample_pair_analysis(pixels)
+    result.add_indicator("Sample Pair Analysis", sample_pair_likelihood, weight=1.1)
+    
+    # 6. RGB correlation
+    rgb_correlation_likelihood = analyze_rgb_correlation(pixels)
+    result.add_indicator("RGB Correlation", rgb_correlation_likelihood, weight=1.0)
+
+def add_structure_indicators(result, image_path):
+    """
+    Add the file-structure indicator for formats with a native parser.
+    
+    The parsed structure is kept in ``result.structure`` (None for other
+    formats) so its findings can be shown alongside the indicators.
+    """
+    result.structure = None
+    if is_png_file(image_path):
+        structure = walk_png(image_path)
+        result.structure = structure.to_dict()
+        result.add_indicator("PNG Structure", structure.score, weight=1.5)
+    elif is_jpeg_file(image_path):
+        structure = walk_jpeg(image_path)
+        result.structure = structure.to_dict()
+        result.add_indicator("JPEG Structure", structure.score, weight=1.5)
+
+def analyze_animation_for_steganography(image_path, max_frames=None):
+    """
+    Analyze every frame of an animated GIF or APNG for signs of steganography.
+    
+    Frames are decoded one at a time; only the current and previous frame
+    are held in memory. Each frame gets its own set of pixel indicators,
+    and consecutive frames are differenced to find frames that changed
+    only in their least significant bits, a common way to hide data in an
+    animation without a visible change.
+    
+    Args:
+        image_path: Path to the image file
+        max_frames: Stop after this many frames (None = all)
+    
+    Returns:
+        DetectionResult object; ``frames`` holds one dictionary per frame
+        with its likelihood, indicator values and differencing counts
+    """
+    result = DetectionResult()
+    result.frames = []
+    
+    try:
+        strongest = {}
+        low_bit_frames = 0
+        previous = None
+        
+        for index, pixels, duration in iter_frames(image_path, max_frames):
+            frame_result = DetectionResult()
+            add_pixel_indicators(frame_result, pixels)
+            frame_result.calculate_overall_likelihood()
+            
+            frame = {
+                "frame": index,
+                "duration": duration,
+                "likelihood": frame_result.likelihood,
+                "indicators": {name: ind["value"] for name, ind in frame_result.indicators.items()},
+                "low_bit_changes": 0,
+                "other_changes": 0,
+                "low_bit_only": False
+            }
+            
+            if previous is not None:
+                low_only, other = low_bit_changes(previous, pixels)
+                frame["low_bit_changes"] = low_only
+                frame["other_changes"] = other
+                frame["low_bit_only"] = (low_only >= MIN_LOW_BIT_CHANGES and
+                                         low_only >= LOW_BIT_ONLY_RATIO * (low_only + other))
+                low_bit_frames += frame["low_bit_only"]
+            
+            # Each indicator reports its most suspicious frame
+            for name, ind in frame_result.indicators.items():
+                if name not in strongest or ind["value"] > strongest[name]["value"]:
+                    strongest[name] = ind
+            
+            result.frames.append(frame)
+            previous = pixels
+        
+        for name, ind in strongest.items():
+            result.add_indicator(name, ind["value"], weight=ind["weight"])
+        
+        if len(result.frames) > 1:
+            result.add_indicator("Frame Differencing",
+                                 min(1.0, low_bit_frames / (len(result.frames) - 1) * 4), weight=1.2)
+        
+        add_structure_indicators(result, image_path)
+        
+        metadata_likelihood = analyze_metadata(image_path)
+        result.add_indicator("Metadata Analysis", metadata_likelihood, weight=0.8)
+        
+        result.calculate_overall_likelihood()
+        result.generate_explanation()
+        result.techniques = determine_potential_techniques(result)
+        
+    except Exception as e:
+        result.explanation = f"Error analyzing animation: {str(e)}"
+        result.likelihood = 0.0
+    
+    return result
+
+def analyze_audio_for_steganography(audio_path):
+    """
+    Analyze a PCM WAV file for signs of LSB steganography.
+    
+    The samples are streamed from a memory map in fixed-size blocks, so
+    memory use does not grow with the length of the recording.
+    
+    Args:
+        audio_path: Path to the WAV file
+    
+    Returns:
+        DetectionResult object with likelihood and explanations
+    """
+    result = DetectionResult()
+    
+    try:
+        info = read_wav_info(audio_path)
+        stats_per_channel = audio_lsb_statistics(info)
+        
+        # 1. Statistical analysis of the sample LSBs
+        lsb_likelihood = max(lsb_indicator_from_statistics(channel_stats)
+                             for channel_stats in stats_per_channel)
+        result.add_indicator("LSB Analysis", scale_likelihood(lsb_likelihood, sensitivity=2.5), weight=1.5)
+        
+        # 2. Chi-square analysis of pairs of values
+        chi_square_likelihood = max(chi_square_from_histogram(channel_stats["histogram"])
+                                    for channel_stats in stats_per_channel)
+        result.add_indicator("Chi-Square Test", scale_likelihood(chi_square_likelihood), weight=1.3)
+        
+        # 3. Metadata analysis
+        metadata_likelihood = analyze_metadata(audio_path)
+        result.add_indicator("Metadata Analysis", metadata_likelihood, weight=0.8)
+        
+        result.calculate_overall_likelihood()
+        result.generate_explanation(medium="audio")
+        result.techniques = determine_potential_techniques(result)
+        
+    except Exception as e:
+        result.explanation = f"Error analyzing audio: {str(e)}"
+        result.likelihood = 0.0
+    
+    return result
+
+def audio_lsb_statistics(info):
+    """
+    Accumulate LSB statistics for every channel of a WAV file in one pass.
+    
+    Args:
+        info: WavInfo from utils.audio.read_wav_info
+    
+    Returns:
+        List with one dictionary per channel: sample count, ones, runs
+        (transitions), adjacent bit pair counts, joint counts of bit 0 and
+        bit 1, and the value histogram used by the chi-square test
+    """
+    # Full value histogram for 8/16-bit audio; for 24-bit, the quiet samples
+    # that fit in 16 bits, where pairs of values are still well populated
+    hist_offset = 128 if info.sample_width == 1 else 32768
+    hist_bins = 2 * hist_offset
+    
+    channels = [{
+        "count": 0,
+        "ones": 0,
+        "runs": 0,
+        "pairs": np.zeros(4, dtype=np.int64),
+        "joint": np.zeros(4, dtype=np.int64),
+        "histogram": np.zeros(hist_bins, dtype=np.int64),
+        "last_bit": None
+    } for _ in range(info.channels)]
+    
+    for block in iter_pcm_samples(info):
+        for channel, channel_stats in enumerate(channels):
+            values = block[:, channel]
+            lsb = (values & 1).astype(np.int64)
+            second = ((values >> 1) & 1).astype(np.int64)
+            
+            # Carry the previous block's last bit across the boundary
+            if channel_stats["last_bit"] is not None:
+                lsb_with_prev = np.concatenate(([channel_stats["last_bit"]], lsb))
+            else:
+                lsb_with_prev = lsb
+            
+            channel_stats["count"] += len(lsb)
+            channel_stats["ones"] += int(lsb.sum())
+            channel_stats["runs"] += int(np.count_nonzero(lsb_with_prev[1:] != lsb_with_prev[:-1]))
+            channel_stats["pairs"] += np.bincount(lsb_with_prev[:-1] * 2 + lsb_with_prev[1:], minlength=4)
+            channel_stats["joint"] += np.bincount(lsb * 2 + second, minlength=4)
+            channel_stats["last_bit"] = int(lsb[-1])
+            
+            shifted = values + hist_offset
+            in_range = shifted[(shifted >= 0) & (shifted < hist_bins)]
+            channel_stats["histogram"] += np.bincount(in_range, minlength=hist_bins)
+    
+    return channels
+
+def lsb_indicator_from_statistics(channel_stats):
+    """
+    Combine accumulated LSB statistics into an unscaled indicator, with the
+    same weighting as detect_lsb_steganography.
+    
+    Args:
+        channel_stats: One channel's dictionary from audio_lsb_statistics
+    
+    Returns:
+        Indicator value (0-1)
+    """
+    count = channel_stats["count"]
+    if count == 0:
+        return 0.0
+    
+    p = channel_stats["ones"] / count
+    bias = abs(p - 0.5) * 2
+    entropy = 0.0 if p in (0.0, 1.0) else -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+    runs = channel_stats["runs"] / count
+    
+    pairs = channel_stats["pairs"] / max(1, channel_stats["pairs"].sum())
+    pair_deviation = np.sum(np.abs(pairs - 0.25)) / 2
+    
+    # Correlation between bit 0 and bit 1 from their joint counts
+    n00, n01, n10, n11 = channel_stats["joint"].astype(float)
+    denominator = np.sqrt((n00 + n01) * (n10 + n11) * (n00 + n10) * (n01 + n11))
+    correlation = (n11 * n00 - n10 * n01) / denominator if denominator > 0 else 0.0
+    
+    return (1 - bias) * 0.3 + entropy * 0.3 + runs * 0.2 + pair_deviation * 0.1 + (1 - abs(correlation)) * 0.1
+
+def chi_square_from_histogram(histogram):
+    """
+    Chi-square test on pairs of values that differ only in the LSB, with
+    the same normalisation as chi_square_test.
+    
+    Args:
+        histogram: Value histogram whose bin 2k and 2k+1 form a pair
+    
+    Returns:
+        Unscaled likelihood (0-1)
+    """
+    total = histogram.sum()
+    if total == 0:
+        return 0.0
+    
+    pairs = histogram.reshape(-1, 2).astype(float)
+    expected = pairs.sum(axis=1) / 2
+    populated = expected > 0
+    chi_square = np.sum((pairs[populated] - expected[populated, None]) ** 2 / expected[populated, None])
+    chi_square /= total
+    
+    try:
+        df = len(expected) - 1
+        p_value = 1 - stats.chi2.cdf(chi_square, df)
+        return 1 - p_value
+    except Exception:
+        return 0.5
+
 def detect_lsb_steganography(pixels):
     """
     Detect LSB steganography by analyzing the statistical properties of the least significant bits.
@@ -240,10 +518,8 @@ def analyze_bit_pairs(bits):
         Likelihood score based on bit pair analysis (0-1)
     """
     # Count the frequency of each pair type: 00, 01, 10, 11
-    pairs = np.zeros(4)
-    for i in range(len(bits) - 1):
-        pair_value = bits[i] * 2 + bits[i+1]
-        pairs[int(pair_value)] += 1
+    bits = np.asarray(bits, dtype=np.int64)
+    pairs = np.bincount(bits[:-1] * 2 + bits[1:], minlength=4).astype(float)
     
     # Normalize to get distribution
     total = np.sum(pairs)
@@ -301,7 +577,7 @@ def analyze_histogram(pixels):
         hist_sorted = np.sort(hist)
         cumulative = np.cumsum(hist_sorted)
         cumulative = cumulative / cumulative[-1]  # Normalize
-        gini = (np.trapz(np.linspace(0, 1, 256), cumulative) - 0.5) * 2
+        gini = (np.trapezoid(np.linspace(0, 1, 256), cumulative) - 0.5) * 2
         
         # Combine metrics
         # Higher peaks, lower Gini (more even distribution) suggest steganography
@@ -422,49 +698,10 @@ def chi_square_test(pixels):
         # Get channel data
         channel_data = pixels[:, :, channel].flatten()
         
-        # Expected frequencies: pairs of values that differ only in LSB should be roughly equal
-        expected_pairs = {}
-        observed_pairs = {}
-        
-        for i in range(0, 255, 2):
-            # Pairs that differ only in LSB: (i, i+1)
-            pair_key = i // 2
-            expected_pairs[pair_key] = 0
-            observed_pairs[pair_key] = [0, 0]  # [count for i, count for i+1]
-        
-        # Count observed frequencies
-        for pixel_value in channel_data:
-            pair_key = (pixel_value // 2)
-            if pair_key in observed_pairs:
-                idx = pixel_value % 2
-                observed_pairs[pair_key][idx] += 1
-        
-        # Calculate expected frequencies (average of pair)
-        for pair_key, counts in observed_pairs.items():
-            expected_pairs[pair_key] = (counts[0] + counts[1]) / 2
-        
-        # Calculate chi-square statistic
-        chi_square = 0
-        for pair_key, expected in expected_pairs.items():
-            if expected > 0:  # Avoid division by zero
-                chi_square += (observed_pairs[pair_key][0] - expected)**2 / expected
-                chi_square += (observed_pairs[pair_key][1] - expected)**2 / expected
-        
-        # Normalize chi-square value
-        chi_square /= len(channel_data)
-        
-        # Convert to p-value
-        # Lower p-value indicates discrepancy between observed and expected
-        try:
-            from scipy import stats
-            df = len(expected_pairs) - 1  # Degrees of freedom
-            p_value = 1 - stats.chi2.cdf(chi_square, df)
-            
-            # Lower p-value means more likely to have hidden data
-            chi_square_values.append(1 - p_value)
-        except:
-            # Fallback if chi2 calculation fails
-            chi_square_values.append(0.5)
+        # Pairs of values that differ only in LSB, (2k, 2k+1), should be
+        # roughly equally frequent; count them all in one pass
+        histogram = np.bincount(channel_data, minlength=256)
+        chi_square_values.append(chi_square_from_histogram(histogram))
     
     # Take the maximum value as our indicator
     chi_square_likelihood = max(chi_square_values)
@@ -484,69 +721,72 @@ def analyze_metadata(image_path):
     Returns:
         Likelihood based on metadata analysis (0-1)
     """
+    exiftool = tool_path("exiftool")
+    if exiftool is None:
+        return 0.4  # Neutral value without exiftool
+    
     try:
-        # Run exiftool to extract metadata
-        with tempfile.NamedTemporaryFile(suffix='.txt') as tmp_file:
-            cmd = ["exiftool", image_path, "-a", "-u", "-g1"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                return 0.4  # Neutral value if exiftool fails
-            
-            metadata_text = result.stdout
-            
-            # Look for suspicious indicators in metadata
-            suspicious_indicators = 0
-            total_indicators = 6  # Number of checks we're performing
-            
-            # 1. Check for unusual or non-standard metadata fields
-            unusual_fields = ["UserComment", "ImageUniqueID", "OwnerName", "Comment", "XMP"]
-            for field in unusual_fields:
-                if field in metadata_text:
-                    suspicious_indicators += 1
-            
-            # 2. Check for unusually large metadata
-            if len(metadata_text) > 2000:  # Arbitrary threshold
+        # Run exiftool through the shared runner so a hung run is killed at its timeout
+        cmd = [exiftool, image_path, "-a", "-u", "-g1"]
+        result = get_tool_runner().submit("exiftool", cmd).result()
+        
+        if result.returncode != 0 or result.timed_out:
+            return 0.4  # Neutral value if exiftool fails or hangs
+        
+        metadata_text = result.stdout
+        
+        # Look for suspicious indicators in metadata
+        suspicious_indicators = 0
+        total_indicators = 6  # Number of checks we're performing
+        
+        # 1. Check for unusual or non-standard metadata fields
+        unusual_fields = ["UserComment", "ImageUniqueID", "OwnerName", "Comment", "XMP"]
+        for field in unusual_fields:
+            if field in metadata_text:
                 suspicious_indicators += 1
-            
-            # 3. Check for binary or encoded data in text fields
-            binary_patterns = [
-                r'\\x[0-9a-fA-F]{2}',  # Hex escape sequences
-                r'[A-Za-z0-9+/=]{20,}',  # Possible base64
-                r'(?:\x00){3,}'  # Null byte sequences
-            ]
-            
-            for pattern in binary_patterns:
-                if re.search(pattern, metadata_text):
-                    suspicious_indicators += 1
-                    break
-            
-            # 4. Check for modification timestamps that don't align
-            timestamps = re.findall(r'Date/Time.*?: (.*?)$', metadata_text, re.MULTILINE)
-            if len(timestamps) > 1:
-                timestamp_set = set(timestamps)
-                if len(timestamp_set) > 1:
-                    suspicious_indicators += 0.5
-            
-            # 5. Check for multiple tool traces
-            editing_tools = re.findall(r'Software.*?: (.*?)$', metadata_text, re.MULTILINE)
-            if len(editing_tools) > 1:
+        
+        # 2. Check for unusually large metadata
+        if len(metadata_text) > 2000:  # Arbitrary threshold
+            suspicious_indicators += 1
+        
+        # 3. Check for binary or encoded data in text fields
+        binary_patterns = [
+            r'\\x[0-9a-fA-F]{2}',  # Hex escape sequences
+            r'[A-Za-z0-9+/=]{20,}',  # Possible base64
+            r'(?:\x00){3,}'  # Null byte sequences
+        ]
+        
+        for pattern in binary_patterns:
+            if re.search(pattern, metadata_text):
+                suspicious_indicators += 1
+                break
+        
+        # 4. Check for modification timestamps that don't align
+        timestamps = re.findall(r'Date/Time.*?: (.*?)$', metadata_text, re.MULTILINE)
+        if len(timestamps) > 1:
+            timestamp_set = set(timestamps)
+            if len(timestamp_set) > 1:
                 suspicious_indicators += 0.5
-            
-            # 6. Check for steganography tool signatures
-            stego_tools = ["outguess", "steghide", "stegdetect", "jsteg", "f5", "steganography"]
-            for tool in stego_tools:
-                if tool.lower() in metadata_text.lower():
-                    suspicious_indicators += 2  # Strong indicator
-                    break
-            
-            # Calculate likelihood based on indicators
-            likelihood = suspicious_indicators / total_indicators
-            
-            # Scale the result
-            likelihood = scale_likelihood(likelihood, sensitivity=1.2)
-            
-            return likelihood
+        
+        # 5. Check for multiple tool traces
+        editing_tools = re.findall(r'Software.*?: (.*?)$', metadata_text, re.MULTILINE)
+        if len(editing_tools) > 1:
+            suspicious_indicators += 0.5
+        
+        # 6. Check for steganography tool signatures
+        stego_tools = ["outguess", "steghide", "stegdetect", "jsteg", "f5", "steganography"]
+        for tool in stego_tools:
+            if tool.lower() in metadata_text.lower():
+                suspicious_indicators += 2  # Strong indicator
+                break
+        
+        # Calculate likelihood based on indicators
+        likelihood = suspicious_indicators / total_indicators
+        
+        # Scale the result
+        likelihood = scale_likelihood(likelihood, sensitivity=1.2)
+        
+        return likelihood
     except Exception as e:
         return 0.4  # Neutral value if analysis fails
 
@@ -681,11 +921,8 @@ def analyze_rgb_correlation(pixels):
 # Utility functions
 def count_runs(binary_data):
     """Count the number of runs in binary data."""
-    runs = 0
-    for i in range(1, len(binary_data)):
-        if binary_data[i] != binary_data[i-1]:
-            runs += 1
-    return runs
+    binary_data = np.asarray(binary_data)
+    return int(np.count_nonzero(binary_data[1:] != binary_data[:-1]))
 
 def calculate_entropy(data):
     """Calculate Shannon entropy."""
@@ -743,6 +980,19 @@ def determine_potential_techniques(result):
     if "Metadata Analysis" in indicators and indicators["Metadata Analysis"]["value"] > 0.6:
         techniques.append("Metadata Embedding")
     
+    # Data hidden in the file structure rather than the pixels
+    structure = getattr(result, "structure", None)
+    if structure:
+        kinds = {finding["kind"] for finding in structure["findings"]}
+        if "trailing_data" in kinds:
+            techniques.append("Appended Data")
+        if kinds & {"unknown_chunk", "unknown_critical_chunk", "large_text_chunk", "large_ancillary_chunk"}:
+            techniques.append("Chunk Embedding")
+        if kinds & {"unknown_app_segment", "large_comment"}:
+            techniques.append("Segment Embedding")
+        if structure.get("stego_tool"):
+            techniques.append(f"{structure['stego_tool']} Steganography")
+    
     # Frequency domain techniques (DCT, etc.)
     if ("Noise Analysis" in indicators and indicators["Noise Analysis"]["value"] > 0.7 and
             "Histogram Analysis" in indicators and indicators["Histogram Analysis"]["value"] > 0.5):
@@ -0,0 +1,133 @@
+"""
+Registry of the external tools the analysis can use.
+Each tool is looked up once per process: its path comes from the PATH
+search and its version from a single concurrent probe. The analysis layers
+ask the registry before spawning anything, so a missing tool costs nothing
+per file and is skipped or replaced by its native implementation.
+"""
+
+import re
+import shutil
+import threading
+from utils.tool_runner import get_tool_runner
+
+# Arguments that make each tool print its version (or a banner holding it)
+TOOL_VERSION_ARGS = {
+    "exiftool": ["-ver"],
+    "binwalk": ["--help"],
+    "strings": ["--version"],
+    "xxd": ["-v"],
+    "zsteg": ["--help"],
+    "steghide": ["--version"],
+    "outguess": ["-h"],
+}
+
+# In-process implementations used instead of a tool, whether or not it is installed
+NATIVE_SUBSTITUTES = {
+    "binwalk": "carving.scan_file",
+    "strings": "file_analysis.iter_strings",
+    "xxd": "file_analysis.hex_window",
+}
+
+# Seconds a version probe may take
+PROBE_TIMEOUT = 5
+
+_VERSION_RE = re.compile(r'\d+(?:\.\d+)+')
+
+class ToolInfo:
+    """What is known about one external tool."""
+    def __init__(self, name, path=None, version=None):
+        self.name = name
+        self.path = path  # Absolute path, or None if not installed
+        self.version = version
+        self.native = NATIVE_SUBSTITUTES.get(name)
+
+    @property
+    def available(self):
+        return self.path is not None
+
+    def to_dict(self):
+        """Convert tool info to dictionary."""
+        return {
+            "name": self.name,
+            "available": self.available,
+            "path": self.path,
+            "version": self.version,
+            "native": self.native
+        }
+
+    def __repr__(self):
+        return f"ToolInfo(name={self.name}, path={self.path}, version={self.version})"
+
+def _parse_version(output):
+    """Version number from a tool's banner, or its first line if it has none."""
+    match = _VERSION_RE.search(output)
+    if match:
+        return match.group()
+    for line in output.splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return None
+
+class ToolRegistry:
+    """
+    Paths and versions of the known external tools.
+
+    probe() fills the registry; only installed tools are spawned, once each,
+    and all version probes run concurrently on the shared ToolRunner.
+    """
+    def __init__(self, tools=None):
+        self.tool_names = list(tools or TOOL_VERSION_ARGS)
+        self.tools = {name: ToolInfo(name) for name in self.tool_names}
+
+    def probe(self, runner=None):
+        """Look every tool up on PATH and record the versions of those found."""
+        runner = runner or get_tool_runner()
+        futures = {}
+        for name in self.tool_names:
+            path = shutil.which(name)
+            self.tools[name] = ToolInfo(name, path)
+            if path is not None:
+                args = TOOL_VERSION_ARGS.get(name, ["--version"])
+                futures[name] = runner.submit(name, [path] + args, timeout=PROBE_TIMEOUT)
+
+        for name, future in futures.items():
+            result = future.result()
+            if not result.found:
+                self.tools[name].path = None
+                continue
+            self.tools[name].version = _parse_version(result.stdout + "\n" + result.stderr)
+        return self
+
+    def get(self, name):
+        """ToolInfo for a tool; unknown tools are reported as not installed."""
+        return self.tools.get(name) or ToolInfo(name)
+
+    def available(self, name):
+        return self.get(name).available
+
+    def path(self, name):
+        """Absolute path of a tool, or None if it is not installed."""
+        return self.get(name).path
+
+    def to_list(self):
+        return [info.to_dict() for info in self.tools.values()]
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_tool_registry():
+    """Shared process-wide ToolRegistry, probed on first use."""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ToolRegistry().probe()
+        return _default_registry
+
+def tool_available(name):
+    """Whether an external tool is installed, without spawning it."""
+    return get_tool_registry().available(name)
+
+def tool_path(name):
+    """Absolute path of an installed tool, or None."""
+    return get_tool_registry().path(name)
@@ -0,0 +1,197 @@
+"""
+Concurrent runner for external analysis tools.
+Tools are started with asyncio.create_subprocess_exec on a background event
+loop, so an upload's tool latency is that of the slowest tool rather than
+the sum of all of them. Results come back as concurrent.futures.Future
+objects, which synchronous callers such as the Streamlit script can wait on
+one at a time.
+"""
+
+import os
+import codecs
+import signal
+import asyncio
+import threading
+import time
+
+# Seconds a tool may run before it is killed, unless overridden per tool
+DEFAULT_TOOL_TIMEOUT = 30
+
+# Per-tool timeouts; zsteg -a tries hundreds of channel combinations
+TOOL_TIMEOUTS = {
+    "exiftool": 30,
+    "zsteg": 120,
+}
+
+# Tools allowed to run at the same time across all uploads
+MAX_CONCURRENT_TOOLS = 4
+
+# Bytes read from a tool's stdout or stderr per step
+READ_CHUNK_SIZE = 64 * 1024
+
+# Seconds allowed for a killed tool's pipes to drain
+KILL_GRACE = 1.0
+
+class ToolResult:
+    """Outcome of one external tool run."""
+    def __init__(self, name, cmd):
+        self.name = name
+        self.cmd = cmd
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.timed_out = False
+        self.found = True  # False when the executable is not installed
+        self.error = None  # Set when the tool could not be started
+        self.duration = 0.0
+
+    @property
+    def output(self):
+        """The tool's stdout, or stderr if it printed nothing, or a description of the failure."""
+        if self.error:
+            return f"Error running {self.name}: {self.error}"
+        text = self.stdout if self.stdout else self.stderr
+        if self.timed_out:
+            return text + f"\nTimeout running {self.name}" if text else f"Timeout running {self.name}"
+        return text
+
+    def to_dict(self):
+        """Convert result to dictionary."""
+        return {
+            "name": self.name,
+            "cmd": self.cmd,
+            "returncode": self.returncode,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "timed_out": self.timed_out,
+            "found": self.found,
+            "error": self.error,
+            "duration": self.duration
+        }
+
+def _kill(process):
+    """Kill a tool and any children it started, which would otherwise keep its pipes open."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+async def _pump(stream, parts, on_output):
+    """
+    Read a pipe to the end, keeping every chunk as it arrives.
+
+    An incremental decoder holds back a multibyte character split across
+    two reads until the rest of it arrives.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            parts.append(text)
+            if on_output is not None:
+                on_output(text)
+        if not chunk:
+            break
+
+class ToolRunner:
+    """
+    Runs external tools concurrently on a private event loop thread.
+
+    A semaphore caps how many tools run at once; further submissions wait
+    for a slot. Output is captured incrementally, so a tool that times out
+    still returns what it printed, and ``on_output`` callbacks see stdout
+    as it is produced. Cancelling a returned future kills the process.
+    """
+    def __init__(self, max_concurrent=MAX_CONCURRENT_TOOLS):
+        self.max_concurrent = max_concurrent
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="tool-runner", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, cmd, timeout=None, on_output=None):
+        """
+        Start a tool without waiting for it.
+
+        Args:
+            name: Tool name, used for the default timeout and messages
+            cmd: Argument list; the first entry is the executable
+            timeout: Seconds before the tool is killed (default from TOOL_TIMEOUTS)
+            on_output: Optional callback receiving stdout text chunks, called
+                on the runner thread
+
+        Returns:
+            concurrent.futures.Future resolving to a ToolResult
+        """
+        if timeout is None:
+            timeout = TOOL_TIMEOUTS.get(name, DEFAULT_TOOL_TIMEOUT)
+        coroutine = self._run(name, [str(arg) for arg in cmd], timeout, on_output)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def run_all(self, commands):
+        """
+        Start several tools at once.
+
+        Args:
+            commands: Dict of tool name -> argument list
+
+        Returns:
+            Dict of tool name -> Future, in the same order
+        """
+        return {name: self.submit(name, cmd) for name, cmd in commands.items()}
+
+    async def _run(self, name, cmd, timeout, on_output):
+        result = ToolResult(name, cmd)
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=os.name == 'posix'  # Own process group, killed as a whole
+                )
+            except OSError as e:
+                result.found = not isinstance(e, FileNotFoundError)
+                result.error = str(e)
+                return result
+
+            stdout, stderr = [], []
+            tasks = [
+                asyncio.ensure_future(_pump(process.stdout, stdout, on_output)),
+                asyncio.ensure_future(_pump(process.stderr, stderr, None)),
+                asyncio.ensure_future(process.wait())
+            ]
+            try:
+                _, pending = await asyncio.wait(tasks, timeout=timeout)
+                result.timed_out = bool(pending)
+            finally:
+                # Timed out or cancelled by the caller; output read so far is kept
+                if process.returncode is None:
+                    _kill(process)
+                _, pending = await asyncio.wait(tasks, timeout=KILL_GRACE)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            result.returncode = process.returncode
+            result.stdout = "".join(stdout)
+            result.stderr = "".join(stderr)
+            result.duration = time.monotonic() - start
+        return result
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+def get_tool_runner():
+    """Shared process-wide ToolRunner."""
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = ToolRunner()
+        return _default_runner
@@ -0,0 +1,150 @@
+"""
+Pixel traversal orders for steganography decoders.
+Embedding tools do not always walk the image row by row; these orders
+reproduce the common alternatives as index arrays, so a decoder can
+re-order its samples with a single fancy-index gather.
+"""
+
+import random
+import hashlib
+from functools import lru_cache
+import numpy as np
+
+# Orders that only depend on the image shape
+GEOMETRIC_TRAVERSALS = ("row", "column", "reverse", "reverse_column", "serpentine", "serpentine_column")
+
+# Orders that are a pseudo-random permutation seeded by a key
+KEYED_TRAVERSALS = ("random", "shuffle")
+
+TRAVERSALS = GEOMETRIC_TRAVERSALS + KEYED_TRAVERSALS
+
+def key_to_seed(key):
+    """Derive a 64-bit seed from a password or integer key."""
+    if isinstance(key, (int, np.integer)):
+        return int(key)
+    if key is None:
+        key = ""
+    digest = hashlib.sha256(str(key).encode('utf-8', errors='surrogateescape')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+# Feistel rounds of the keyed "random" order
+FEISTEL_ROUNDS = 4
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+def _mix(values):
+    """splitmix64 finalizer, applied element-wise to a uint64 array."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+class KeyedOrder:
+    """
+    Keyed pseudo-random permutation of ``n`` pixel indices, computed on demand.
+
+    Position i maps through a Feistel network over the smallest even-bit
+    domain holding n indices; results outside the image are fed through again
+    (cycle walking) until they land inside it. Any slice therefore costs time
+    proportional to its length, so a header probe along a password's walk
+    touches a few hundred indices instead of shuffling the whole image, and
+    nothing is kept once the decoder is done.
+    """
+    def __init__(self, n, key):
+        self.n = n
+        self._half_bits = np.uint64(max(1, ((n - 1).bit_length() + 1) // 2))
+        self._mask = np.uint64((1 << int(self._half_bits)) - 1)
+        digest = hashlib.sha256(str(key_to_seed(key)).encode('ascii')).digest()
+        self._round_keys = np.frombuffer(digest, dtype='<u8')[:FEISTEL_ROUNDS]
+
+    def __len__(self):
+        return self.n
+
+    def _permute(self, positions):
+        left = positions >> self._half_bits
+        right = positions & self._mask
+        for round_key in self._round_keys:
+            left, right = right, left ^ (_mix(right ^ round_key) & self._mask)
+        return (left << self._half_bits) | right
+
+    def __getitem__(self, index):
+        """Indices at a slice of positions, as an int64 array."""
+        if not isinstance(index, slice):
+            raise TypeError("KeyedOrder only supports slicing")
+        start, stop, step = index.indices(self.n)
+        order = self._permute(np.arange(start, stop, step, dtype=np.uint64))
+        outside = np.flatnonzero(order >= self.n)
+        while len(outside):
+            order[outside] = self._permute(order[outside])
+            outside = outside[order[outside] >= self.n]
+        return order.astype(np.int64)
+
+    def __array__(self, dtype=None, copy=None):
+        order = self[:]
+        return order if dtype is None else order.astype(dtype)
+
+def _grid(height, width):
+    return np.arange(height * width, dtype=np.int64).reshape(height, width)
+
+@lru_cache(maxsize=8)
+def _traversal_cached(height, width, traversal):
+    n = height * width
+    if traversal == "row":
+        order = np.arange(n, dtype=np.int64)
+    elif traversal == "column":
+        order = _grid(height, width).T.reshape(-1)
+    elif traversal == "reverse":
+        order = np.arange(n - 1, -1, -1, dtype=np.int64)
+    elif traversal == "reverse_column":
+        order = _grid(height, width).T.reshape(-1)[::-1].copy()
+    elif traversal == "serpentine":
+        # Left to right on even rows, right to left on odd rows
+        grid = _grid(height, width)
+        grid[1::2] = grid[1::2, ::-1]
+        order = grid.reshape(-1)
+    elif traversal == "serpentine_column":
+        # Top to bottom on even columns, bottom to top on odd columns
+        grid = _grid(height, width).T.copy()
+        grid[1::2] = grid[1::2, ::-1]
+        order = grid.reshape(-1)
+    else:
+        raise ValueError(f"Unknown traversal {traversal!r}")
+
+    order.setflags(write=False)
+    return order
+
+def _shuffled_order(n, key):
+    """Python's random.shuffle seeded with the key, as used by many embedding scripts."""
+    indices = list(range(n))
+    random.Random(key).shuffle(indices)
+    return np.array(indices, dtype=np.int64)
+
+def pixel_order(shape, traversal="row", key=None):
+    """
+    Index array giving the order in which pixels are visited.
+
+    Geometric orders are cached per image shape, so repeated decoders over
+    the same image share one copy. Keyed orders are never cached: a password
+    sweep uses each key once, and keeping its permutation would pin one
+    int64 per pixel. "random" is returned as a KeyedOrder, which computes
+    only the slices a decoder reads.
+
+    Args:
+        shape: Image shape; only (height, width) is used
+        traversal: One of TRAVERSALS
+        key: Password or integer seed for the keyed traversals
+
+    Returns:
+        1-D int64 array (or KeyedOrder) of flat pixel indices, or None for
+        plain row-major order (no re-ordering needed)
+    """
+    if traversal == "row":
+        return None
+    height, width = (int(size) for size in shape[:2])
+    if traversal == "random":
+        return KeyedOrder(height * width, key)
+    if traversal == "shuffle":
+        return _shuffled_order(height * width, key)
+    return _traversal_cached(height, width, traversal)
@@ -1006,9 +1006,59 @@ def create_strings_visualization(strings, max_strings=300):
     
     return fig
 
+def _hex_byte_color(byte_val):
+    """Higher bytes more magenta, lower more cyan."""
+    r = min(255, byte_val * 2)
+    g = max(0, 80 - byte_val // 3)
+    b = min(255, 255 - byte_val // 2)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+def _build_hex_spans():
+    hex_spans = []
+    ascii_spans = []
+    escapes = {'<': '&lt;', '>': '&gt;', '&': '&amp;'}
+    for byte_val in range(256):
+        color = _hex_byte_color(byte_val)
+        hex_spans.append(f'<span style="color: {color};">{byte_val:02x}</span> ')
+        if 32 <= byte_val <= 126:  # Printable ASCII range
+            char = chr(byte_val)
+            ascii_spans.append(f'<span style="color: {color};">{escapes.get(char, char)}</span>')
+        else:
+            ascii_spans.append('<span style="color: #555;">.</span>')
+    return hex_spans, ascii_spans
+
+# Styled markup of every byte value, so rows are formatted by table lookup
+_HEX_BYTE_SPANS, _HEX_ASCII_SPANS = _build_hex_spans()
+
+def _parse_hex_dump_text(hex_dump):
+    """Turn "address: b0 b1 ..." lines into (address, byte values) pairs."""
+    rows = []
+    for i, line in enumerate(hex_dump.split('\n')):
+        if not line.strip():
+            continue
+        parts = line.split(':') if ':' in line else [f"{i:08x}", line]
+        values = []
+        for byte in parts[1].split():
+            if len(byte) == 2:  # Ensure it's a hex byte
+                try:
+                    values.append(int(byte, 16))
+                except ValueError:
+                    values.append(byte)
+        rows.append((parts[0].strip(), values))
+    return rows
+
 def format_hex_dump(hex_dump):
-    """Format hex dump with cyberpunk styling."""
-    lines = hex_dump.split('\n')
+    """
+    Format hex dump with cyberpunk styling.
+
+    Args:
+        hex_dump: Rows from hex_window / hex_rows, or "address: b0 b1 ..."
+            text lines
+    """
+    if isinstance(hex_dump, str):
+        rows = _parse_hex_dump_text(hex_dump)
+    else:
+        rows = [(f"{row['address']:08x}", row["bytes"]) for row in hex_dump]
     formatted = []
     
     # Add cyberpunk header - use explicit HTML escaping for the template
@@ -1030,75 +1080,33 @@ def format_hex_dump(hex_dump):
     formatted.append(header)
     
     # Add each line with advanced styling
-    for i, line in enumerate(lines):
-        if line.strip():
-            # Split line to get address and hex data
-            parts = line.split(':') if ':' in line else [f"{i:08x}", line]
-            
-            if len(parts) >= 2:
-                addr = parts[0].strip()
-                data = parts[1].strip()
-                
-                # Format address with cyan color
-                addr_formatted = f'<span style="color: #00ffff; font-weight: bold;">{addr}</span>'
-                
-                # Format hex bytes with color gradients
-                bytes_formatted = ""
-                ascii_formatted = ""
-                
-                # Process hex bytes to add color and extract ASCII
-                hex_bytes = data.split()
-                for j, byte in enumerate(hex_bytes):
-                    if len(byte) == 2:  # Ensure it's a hex byte
-                        # Color based on value (higher bytes more magenta, lower more cyan)
-                        try:
-                            byte_val = int(byte, 16)
-                            # Calculate color based on byte value 
-                            r = min(255, byte_val * 2)
-                            g = max(0, 80 - byte_val // 3)
-                            b = min(255, 255 - byte_val // 2)
-                            
-                            color = f"#{r:02x}{g:02x}{b:02x}"
-                            
-                            # Add colored byte
-                            bytes_formatted += f'<span style="color: {color};">{byte}</span> '
-                            
-                            # Add ASCII representation if it's a printable character
-                            if 32 <= byte_val <= 126:  # Printable ASCII range
-                                char = chr(byte_val)
-                                # Escape special HTML characters
-                                if char == '<': char = '&lt;'
-                                elif char == '>': char = '&gt;'
-                                elif char == '&': char = '&amp;'
-                                
-                                ascii_formatted += f'<span style="color: {color};">{char}</span>'
-                            else:
-                                ascii_formatted += '<span style="color: #555;">.</span>'
-                                
-                        except ValueError:
-                            bytes_formatted += f'<span style="color: #ff00ff;">{byte}</span> '
-                            ascii_formatted += '<span style="color: #555;">.</span>'
-                
-                # Combine everything with proper spacing and styling
-                styled_line = f"""
-                <div style="font-family: monospace; margin: 3px 0; display: flex; background: rgba(0,10,30,0.3); 
-                            padding: 3px; border-left: 2px solid #00ffff;">
-                    <div style="width: 90px; padding-right: 10px; text-align: right; border-right: 1px solid #ff00ff;
-                               margin-right: 10px;">{addr_formatted}</div>
-                    <div style="flex-grow: 1;">{bytes_formatted}</div>
-                    <div style="margin-left: 10px; padding-left: 10px; border-left: 1px solid #ffff00;">
-                        {ascii_formatted}
-                    </div>
-                </div>"""
-                formatted.append(styled_line)
+    for addr, values in rows:
+        # Format address with cyan color
+        addr_formatted = f'<span style="color: #00ffff; font-weight: bold;">{addr}</span>'
+        
+        # Colored hex bytes and their ASCII representation
+        bytes_formatted = ""
+        ascii_formatted = ""
+        for byte_val in values:
+            if isinstance(byte_val, int):
+                bytes_formatted += _HEX_BYTE_SPANS[byte_val]
+                ascii_formatted += _HEX_ASCII_SPANS[byte_val]
             else:
-                # Handle lines without clear structure
-                styled_line = f"""
-                <div style="font-family: monospace; margin: 3px 0; color: #ff00ff; background: rgba(0,10,30,0.3);
-                            padding: 3px; border-left: 2px solid #ff00ff;">
-                    {line}
-                </div>"""
-                formatted.append(styled_line)
+                bytes_formatted += f'<span style="color: #ff00ff;">{byte_val}</span> '
+                ascii_formatted += '<span style="color: #555;">.</span>'
+        
+        # Combine everything with proper spacing and styling
+        styled_line = f"""
+        <div style="font-family: monospace; margin: 3px 0; display: flex; background: rgba(0,10,30,0.3); 
+                    padding: 3px; border-left: 2px solid #00ffff;">
+            <div style="width: 90px; padding-right: 10px; text-align: right; border-right: 1px solid #ff00ff;
+                       margin-right: 10px;">{addr_formatted}</div>
+            <div style="flex-grow: 1;">{bytes_formatted}</div>
+            <div style="margin-left: 10px; padding-left: 10px; border-left: 1px solid #ffff00;">
+                {ascii_formatted}
+            </div>
+        </div>"""
+        formatted.append(styled_line)
     
     # Add cyberpunk footer
     footer = """
@@ -1112,7 +1120,7 @@ def format_hex_dump(hex_dump):
     """
     
     # Format the footer with the line count
-    formatted.append(footer.format(lines_count=len(lines)))
+    formatted.append(footer.format(lines_count=len(rows)))
     
     return "\n".join(formatted)
 